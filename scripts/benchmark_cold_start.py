@@ -0,0 +1,163 @@
+"""
+Benchmark of the cold start of the AWS Lambda defined by handle_submission.py:
+the time taken to import it in a fresh Python process, and then to handle a
+first submission, as after the Lambda has been idle. The GitHub API is replaced
+by a local stand-in, which answers at once, so that only the time spent in the
+Lambda is measured, and a private key is generated for the run. Also checks
+that boto3, which is only needed if the Lambda is invoked too often, is not
+imported.
+
+Run from the root of the repository, e.g.
+
+```
+python scripts/benchmark_cold_start.py --repeat 10 --max-seconds 1
+```
+
+Requires the dependencies of the Lambda (requests, and PyJWT with
+cryptography) to be installed, but not boto3.
+"""
+
+from argparse import ArgumentParser
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps as to_json, loads as from_json
+from os import environ
+from pathlib import Path
+from statistics import median
+from subprocess import run
+from sys import executable, exit as sys_exit
+from tempfile import TemporaryDirectory
+from threading import Thread
+
+from cryptography.hazmat.primitives.asymmetric.rsa import generate_private_key
+from cryptography.hazmat.primitives.serialization import (
+    Encoding, NoEncryption, PrivateFormat)
+
+_SCRIPTS_PATH = Path(__file__).parent
+
+# Run in a fresh process for each measurement, from the directory holding the
+# private key. Prints the measurements as JSON
+_COLD_START = """
+from json import dumps as to_json
+from sys import argv, modules
+from time import perf_counter
+start = perf_counter()
+import handle_submission
+imported = perf_counter()
+handle_submission.GITHUB_API_URL = argv[1]
+response = handle_submission.lambda_handler({
+    "requestContext": {"http": {"method": "POST", "path": "/add"}},
+    "isBase64Encoded": False,
+    "body": "title=Benchmark&type=tool"
+}, None)
+handled = perf_counter()
+print(to_json({
+    "import_seconds": imported - start,
+    "first_call_seconds": handled - imported,
+    "location": response["headers"]["Location"],
+    "boto3_imported": "boto3" in modules
+}))
+"""
+
+
+class _GitHubStandIn(BaseHTTPRequestHandler):
+    """
+    Answers the requests for an installation token and for a dispatch as
+    GitHub would if they succeeded
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """
+        Called by the server for each POST request
+        """
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path.endswith("/access_tokens"):
+            status = 201
+            body = to_json({
+                "token": "installation-token",
+                "expires_at": (
+                    datetime.now(timezone.utc) + timedelta(hours=1)
+                ).strftime("%Y-%m-%dT%H:%M:%SZ")
+            }).encode("utf-8")
+        else:
+            status = 204
+            body = b""
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_) -> None:  # pylint: disable=arguments-differ
+        pass
+
+
+def _write_private_key(path: Path) -> None:
+    path.write_bytes(generate_private_key(
+        public_exponent=65537, key_size=2048).private_bytes(
+            Encoding.PEM, PrivateFormat.PKCS8, NoEncryption()))
+
+
+def _cold_start(directory: Path, api_url: str) -> dict:
+    completed = run(
+        [executable, "-c", _COLD_START, api_url],
+        cwd=directory,
+        env={**environ, "PYTHONPATH": str(_SCRIPTS_PATH.resolve())},
+        capture_output=True,
+        text=True,
+        check=True)
+    return from_json(completed.stdout.splitlines()[-1])
+
+
+def _arguments_parser() -> ArgumentParser:
+    argument_parser = ArgumentParser(
+        description=(
+            "Times the import of the Lambda and its handling of a first "
+            "submission in fresh processes, against a local stand-in for "
+            "the GitHub API"))
+    argument_parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of cold starts, of which the median times are "
+             "reported. Defaults to 5")
+    argument_parser.add_argument(
+        "--max-seconds",
+        type=float,
+        help="Exit with a non-zero status if the median time of a cold start "
+             "(import and first submission) exceeds this many seconds, e.g. "
+             "in continuous integration")
+    return argument_parser
+
+
+def _main() -> None:
+    arguments = _arguments_parser().parse_args()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _GitHubStandIn)
+    Thread(target=server.serve_forever, daemon=True).start()
+    api_url = f"http://127.0.0.1:{server.server_port}"
+    with TemporaryDirectory() as directory:
+        _write_private_key(Path(directory) / "egad_github_app_private_key.pem")
+        results = [
+            _cold_start(Path(directory), api_url)
+            for _ in range(arguments.repeat)]
+    server.shutdown()
+    import_seconds = median(result["import_seconds"] for result in results)
+    first_call_seconds = median(
+        result["first_call_seconds"] for result in results)
+    print(f"{"import":<12} {import_seconds * 1000:>8.1f} ms")
+    print(f"{"first call":<12} {first_call_seconds * 1000:>8.1f} ms")
+    print(f"{"cold start":<12} "
+          f"{(import_seconds + first_call_seconds) * 1000:>8.1f} ms")
+    if any(not result["location"].endswith("add_success.html")
+           for result in results):
+        sys_exit("The submission was not passed on successfully")
+    if any(result["boto3_imported"] for result in results):
+        sys_exit("boto3 was imported, which slows cold starts down")
+    if arguments.max_seconds is not None and \
+            import_seconds + first_call_seconds > arguments.max_seconds:
+        sys_exit(
+            f"The cold start took longer than {arguments.max_seconds} s")
+
+
+if __name__ == "__main__":
+    _main()
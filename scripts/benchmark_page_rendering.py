@@ -0,0 +1,206 @@
+"""
+Micro-benchmark of the cost of rendering the page chrome (header, logo, RiC
+links, menus) of the resource details, edit, and filtering pages. Compares
+substituting the full site template for every page, as was done originally,
+with joining the fragments prebuilt once per kind of page. Checks that both
+give identical HTML.
+
+Run from the root of the repository, e.g.
+
+```
+python scripts/benchmark_page_rendering.py master-document/resource_list.csv
+```
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+from timeit import Timer
+from typing import Callable
+
+# pylint: disable=protected-access
+import resource_list
+from resource_list import (
+    CSS_FILE_NAME,
+    EDITS_DIRECTORY_NAME,
+    ICONS_DIRECTORY_NAME,
+    LOGO_FILE_NAME,
+    HTML,
+    URL
+)
+
+_BACKEND_URL = "https://example.org/edit"
+
+
+def _substituted_resource_details(parts: dict[str, HTML]) -> HTML:
+    return resource_list._site_template.substitute(
+        css_path=f"../{CSS_FILE_NAME}",
+        logo_path=f"../{LOGO_FILE_NAME}",
+        icons_path=f"../{ICONS_DIRECTORY_NAME}",
+        resource_list_path="../index.html",
+        javascript="",
+        introduction=resource_list._RESOURCE_DETAILS_INTRODUCTION_HTML,
+        add_or_edit_menu=resource_list._add_or_edit_menu_html_template
+        .substitute(
+            components=resource_list._add_or_edit_menu_components[
+                "edit"].substitute(
+                    edit_resource_path=f"../{EDITS_DIRECTORY_NAME}",
+                    resource_id=parts["resource_id"],
+                    icons_path=f"../{ICONS_DIRECTORY_NAME}")),
+        filter_menu="",
+        content=resource_list._resource_details_html_template.substitute(
+            parts))
+
+
+def _prebuilt_resource_details(parts: dict[str, HTML]) -> HTML:
+    return resource_list._resource_details_page().render(**parts)
+
+
+def _substituted_edit(values: dict[str, HTML], backend_url: URL) -> HTML:
+    return resource_list._site_template.substitute(
+        css_path=f"../{CSS_FILE_NAME}",
+        logo_path=f"../{LOGO_FILE_NAME}",
+        resource_list_path="../index.html",
+        javascript="",
+        introduction=resource_list._EDIT_RESOURCE_INTRODUCTION_HTML,
+        add_or_edit_menu="",
+        filter_menu="",
+        content=resource_list._add_resource_html_template.substitute(
+            values, backend_url=backend_url, submit_value="Edit"))
+
+
+def _prebuilt_edit(values: dict[str, HTML], backend_url: URL) -> HTML:
+    return resource_list._edit_page(backend_url).render(**values)
+
+
+def _substituted_filtering(filter_type: str, list_entries: HTML) -> HTML:
+    # pylint: disable=line-too-long
+    return resource_list._site_template.substitute(
+        css_path=f"../{CSS_FILE_NAME}",
+        logo_path=f"../{LOGO_FILE_NAME}",
+        icons_path=f"../{ICONS_DIRECTORY_NAME}",
+        resource_list_path="../index.html",
+        javascript="",
+        introduction=resource_list._RESOURCE_LIST_INTRODUCTION_HTML,
+        add_or_edit_menu=resource_list._add_or_edit_menu_html_template.substitute(
+            components=resource_list._add_or_edit_menu_components[
+                "add"].substitute(
+                    add_resource_path="..",
+                    icons_path=f"../{ICONS_DIRECTORY_NAME}")),
+        filter_menu=resource_list._filter_menu_html_template.substitute(
+            components="\n".join(
+                template.substitute(
+                    applications_path=resource_list._filtering_path(
+                        filter_type, "web application"),
+                    articles_path=resource_list._filtering_path(
+                        filter_type, "article"),
+                    datasets_path=resource_list._filtering_path(
+                        filter_type, "dataset"),
+                    events_path=resource_list._filtering_path(
+                        filter_type, "event"),
+                    theses_path=resource_list._filtering_path(
+                        filter_type, "thesis"),
+                    tools_path=resource_list._filtering_path(
+                        filter_type, "tool"),
+                    icons_path=f"../{ICONS_DIRECTORY_NAME}",
+                    css_class=resource_list._css_class(
+                        filter_type, resource_type))
+                for resource_type, template in
+                resource_list._filter_menu_components.items())),
+        content=resource_list._resource_list_html_template.substitute(
+            list_entries=list_entries,
+            navigation="",
+            last_updated="2025-01-01 00:00 (GMT)"))
+
+
+def _prebuilt_filtering(filter_type: str, list_entries: HTML) -> HTML:
+    return resource_list._filtering_page(filter_type).render(
+        list_entries=list_entries,
+        navigation="",
+        last_updated="2025-01-01 00:00 (GMT)")
+
+
+def _microseconds_per_page(
+        render: Callable[[], list[HTML]], pages: int, repeat: int) -> float:
+    timer = Timer(render)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number / pages * 1e6
+
+
+def _compare(
+        name: str,
+        substituted: Callable[[], list[HTML]],
+        prebuilt: Callable[[], list[HTML]],
+        pages: int,
+        repeat: int) -> None:
+    if substituted() != prebuilt():
+        raise AssertionError(f"Prebuilt {name} pages differ from substituted")
+    before = _microseconds_per_page(substituted, pages, repeat)
+    after = _microseconds_per_page(prebuilt, pages, repeat)
+    print(f"{name:<17} {before:>11.2f} {after:>10.2f} {before / after:>8.1f}x")
+
+
+def _arguments_parser() -> ArgumentParser:
+    argument_parser = ArgumentParser(
+        description=(
+            "Compares the per-page cost of rendering the page chrome by "
+            "substituting the site template with that of joining prebuilt "
+            "fragments"))
+    argument_parser.add_argument(
+        "path_to_master_document",
+        type=Path,
+        help="Path to the CSV master document for the resource list")
+    argument_parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of timing runs, of which the fastest is reported. "
+             "Defaults to 5")
+    return argument_parser
+
+
+def _main() -> None:
+    arguments = _arguments_parser().parse_args()
+    resources = resource_list._read_master_document(
+        arguments.path_to_master_document)
+    details_parts = [
+        resource_list._resource_details_parts(resource)
+        for resource in resources]
+    edit_values = [
+        resource_list._edit_form_values(resource) for resource in resources]
+    list_entries = "".join(
+        resource_list._resource(
+            resource,
+            f"../{ICONS_DIRECTORY_NAME}",
+            f"../{resource_list.RESOURCE_DETAILS_DIRECTORY_NAME}")
+        for resource in resources)
+    filter_types = list(resource_list._resource_type_filters)
+    print(f"{len(resources)} resources. Microseconds per page:")
+    print(f"{'page':<17} {'substituted':>11} {'prebuilt':>10} {'speed-up':>9}")
+    _compare(
+        "resource details",
+        lambda: [_substituted_resource_details(parts)
+                 for parts in details_parts],
+        lambda: [_prebuilt_resource_details(parts)
+                 for parts in details_parts],
+        len(details_parts),
+        arguments.repeat)
+    _compare(
+        "edit",
+        lambda: [_substituted_edit(values, _BACKEND_URL)
+                 for values in edit_values],
+        lambda: [_prebuilt_edit(values, _BACKEND_URL)
+                 for values in edit_values],
+        len(edit_values),
+        arguments.repeat)
+    _compare(
+        "filtering",
+        lambda: [_substituted_filtering(filter_type, list_entries)
+                 for filter_type in filter_types],
+        lambda: [_prebuilt_filtering(filter_type, list_entries)
+                 for filter_type in filter_types],
+        len(filter_types),
+        arguments.repeat)
+
+
+if __name__ == "__main__":
+    _main()
@@ -0,0 +1,470 @@
+"""
+Benchmark of the generation of the website, and of the updating of the master
+document, as the master document grows. Generates synthetic master documents
+of the given numbers of rows, resembling the real one (titles and descriptions
+in more than one language, versioned dates, Markdown links, related
+resources), then times each sub-command of resource_list.py and of
+update_master_document.py against them, recording the wall time and peak
+memory of each. The results are saved as JSON, along with the commit they were
+obtained at, and can be compared with those saved at another commit.
+
+Run from the root of the repository, e.g.
+
+```
+python scripts/benchmark_site_generation.py --rows 1000 10000 \
+    --output benchmark.json
+python scripts/benchmark_site_generation.py --rows 1000 10000 \
+    --compare benchmark.json
+```
+
+Peak memory is measured with wait4, so is only available on Unix.
+"""
+
+from argparse import ArgumentParser
+from csv import DictWriter
+from json import dumps as to_json, loads as from_json
+from os import environ, wait4, waitstatus_to_exitcode
+from pathlib import Path
+from platform import python_version
+from random import Random
+from shutil import copyfile
+from subprocess import DEVNULL, Popen, run
+from sys import executable, platform
+from tempfile import TemporaryDirectory, TemporaryFile
+from time import perf_counter
+from urllib.parse import urlencode
+
+from update_master_document import FIELDNAMES
+
+Row = dict[str, str]
+
+_SCRIPTS_PATH = Path(__file__).parent
+
+_RESOURCE_LIST_PATH = _SCRIPTS_PATH / "resource_list.py"
+
+_UPDATE_MASTER_DOCUMENT_PATH = _SCRIPTS_PATH / "update_master_document.py"
+
+_BACKEND_URL = "https://example.org/backend"
+
+_TYPES = [
+    "article", "tool", "event", "thesis", "web application", "dataset"
+]
+
+_LANGUAGES = [
+    "English", "French", "German", "Italian", "Spanish", "Portuguese",
+    "Dutch", "English | French", "French | English (abstract)",
+    "English | Croatian (title and abstract)"
+]
+
+_RIC_PARTS = [
+    "RiC-CM 1.0", "RiC-CM 0.2", "RiC-O 1.0", "RiC-O 0.2",
+    "RiC-CM 1.0 | RiC-O 1.0", "RiC-CM 0.2 | RiC-O 0.2", "Other"
+]
+
+_NAMES = [
+    "Florence Clavaud", "Tobias Wildi", "Jan Krause-Bilvin", "Aurèle Nicolet",
+    "Ludovica Gheorghiu", "Pierre-Yves Lefèvre", "Inês Koch", "Arian Rajh",
+    "Lina Bountouri", "Eleftherios Kalogeros", "Søren Møller", "Zoë Dupré"
+]
+
+_ORGANISATIONS = [
+    ("Archives nationales de France", "https://www.archives-nationales.culture.gouv.fr"),  # pylint: disable=line-too-long
+    ("docuteam", "https://www.docuteam.ch"),
+    ("ICA EGAD", "https://www.ica.org/ica-network/expert-groups/egad/"),
+    ("Fondation SAPA", "https://sapa.swiss")
+]
+
+_ENGLISH_WORDS = (
+    "records contexts archival description ontology conceptual model "
+    "linked open data graph migration entities relations agents "
+    "instantiation provenance authority finding aids portal metadata "
+    "standard repository institution conversion dataset semantic web"
+).split()
+
+_FRENCH_WORDS = (
+    "archives notices description modèle conceptuel données liées "
+    "graphe relations agents entités provenance référentiel instruments "
+    "recherche métadonnées norme institution conversion sémantique "
+    "répertoire collections fonds"
+).split()
+
+
+def _sentence(random: Random, words: list[str], length: int) -> str:
+    sentence = " ".join(random.choice(words) for _ in range(length))
+    return sentence[0].upper() + sentence[1:] + "."
+
+
+def _markdown_link(random: Random, words: list[str]) -> str:
+    text = " ".join(random.choice(words) for _ in range(3))
+    return f"[{text}](https://example.org/{random.randrange(10**6)})"
+
+
+def _paragraph(random: Random, words: list[str]) -> str:
+    sentences = [
+        _sentence(random, words, random.randint(8, 25))
+        for _ in range(random.randint(2, 6))]
+    if random.random() < 0.5:
+        sentences.append(
+            f"See {_markdown_link(random, words)} for more details.")
+    return " ".join(sentences)
+
+
+def _title(random: Random) -> str:
+    english = _sentence(random, _ENGLISH_WORDS, random.randint(3, 10))[:-1]
+    if random.random() < 0.3:
+        french = _sentence(random, _FRENCH_WORDS, random.randint(3, 10))[:-1]
+        return f"{french} [fr] | {english} [en]"
+    return english
+
+
+def _description(random: Random) -> str:
+    english = _paragraph(random, _ENGLISH_WORDS)
+    if random.random() < 0.4:
+        return f"{_paragraph(random, _FRENCH_WORDS)} [fr] | {english} [en]"
+    return english
+
+
+def _responsible(random: Random) -> str:
+    responsible = []
+    for _ in range(random.randint(1, 4)):
+        if random.random() < 0.2:
+            organisation, url = random.choice(_ORGANISATIONS)
+            if random.random() < 0.5:
+                responsible.append(f"{organisation} ([{organisation}]({url}))")
+            else:
+                responsible.append(f"{organisation} ({url})")
+        else:
+            responsible.append(random.choice(_NAMES))
+    return " | ".join(responsible)
+
+
+def _publication_date(random: Random) -> str:
+    year = random.randint(2015, 2025)
+    month = random.randint(1, 12)
+    if random.random() < 0.2:
+        versions = []
+        for version in range(random.randint(2, 4), 0, -1):
+            versions.append(
+                f"{year + version}-{month:02} [version {version}.0]")
+        return " | ".join(versions)
+    if random.random() < 0.5:
+        return f"{year}-{month:02}-{random.randint(1, 28):02}"
+    return f"{year}-{month:02}"
+
+
+def _links(random: Random) -> str:
+    links = []
+    for _ in range(random.randint(0, 3)):
+        if random.random() < 0.5:
+            links.append(_markdown_link(random, _ENGLISH_WORDS))
+        else:
+            links.append(f"https://example.org/{random.randrange(10**6)}")
+    return " | ".join(links)
+
+
+def _contact(random: Random) -> str:
+    if random.random() < 0.5:
+        return ""
+    return " | ".join(
+        f"{random.choice(_NAMES).split()[0].lower()}@example.org"
+        for _ in range(random.randint(1, 2)))
+
+
+def _related_to(random: Random, resource_id: int) -> str:
+    if resource_id == 1 or random.random() < 0.7:
+        return ""
+    return " | ".join(
+        f"#{random.randint(1, resource_id - 1)}"
+        for _ in range(random.randint(1, 3)))
+
+
+def _synthetic_row(random: Random, resource_id: int) -> Row:
+    return {
+        "id": str(resource_id),
+        "title": _title(random),
+        "responsible": _responsible(random),
+        "description": _description(random),
+        "publication_date": _publication_date(random),
+        "type": random.choice(_TYPES),
+        "links": _links(random),
+        "languages": random.choice(_LANGUAGES),
+        "status": "",
+        "relevant_parts_of_ric": random.choice(_RIC_PARTS),
+        "prospects": _paragraph(random, _ENGLISH_WORDS)
+        if random.random() < 0.2 else "",
+        "contact": _contact(random),
+        "related_to": _related_to(random, resource_id)
+    }
+
+
+def write_synthetic_master_document(
+        path: Path, rows: int, seed: int = 0) -> None:
+    """
+    Writes a master document with the given number of synthetic rows, which
+    are the same for the same seed
+    """
+    random = Random(seed)
+    with open(path, "w", encoding="utf-8") as master_document:
+        writer = DictWriter(
+            master_document,
+            FIELDNAMES,
+            delimiter=",",
+            quotechar="\"",
+            lineterminator="\n")
+        writer.writeheader()
+        for resource_id in range(1, rows + 1):
+            writer.writerow(_synthetic_row(random, resource_id))
+
+
+def _form_submission(row: Row) -> str:
+    return urlencode({
+        field: value for field, value in row.items()
+        if field != "status" and value})
+
+
+def _time(
+        command: list[str],
+        working_directory: Path,
+        extra_environment: dict[str, str]) -> tuple[float, int]:
+    """
+    Runs the command, returning its wall time in seconds and its peak memory
+    (maximum resident set size) in kibibytes. Its standard error is written to
+    a temporary file rather than to a pipe, which is only read once the
+    command has finished, so that a command writing more than a pipe can hold
+    does not block forever.
+    """
+    with TemporaryFile() as standard_error:
+        start = perf_counter()
+        with Popen(
+                command,
+                cwd=working_directory,
+                env=environ | extra_environment,
+                stdout=DEVNULL,
+                stderr=standard_error) as process:
+            _, status, resource_usage = wait4(process.pid, 0)
+            seconds = perf_counter() - start
+            # wait4 has reaped the process, so Popen must not wait for it
+            # again
+            process.returncode = waitstatus_to_exitcode(status)
+        if process.returncode != 0:
+            standard_error.seek(0)
+            raise RuntimeError(
+                f"Failed: {" ".join(command)}\n"
+                f"{standard_error.read().decode("utf-8")}")
+    # ru_maxrss is in bytes on macOS, and in kibibytes elsewhere
+    peak_memory = resource_usage.ru_maxrss
+    if platform == "darwin":
+        peak_memory //= 1024
+    return seconds, peak_memory
+
+
+def _benchmarks(
+        working_directory: Path,
+        rows: int,
+        seed: int) -> list[tuple[str, list[str], dict[str, str]]]:
+    """
+    The commands to benchmark against a master document of the given number
+    of rows, each with the environment variables it needs. The master
+    document is at the path which update_master_document.py expects relative
+    to the working directory.
+    """
+    master_document = Path("master-document") / "resource_list.csv"
+    edited_row = _synthetic_row(Random(seed + 1), rows // 2 or 1)
+    edited_row["title"] += " (edited)"
+    added_row = _synthetic_row(Random(seed + 2), rows + 1)
+    del added_row["id"]
+    for directory in [
+            "resource-details", "filterings", "edits",
+            *(f"{site}/{directory}"
+              for site in ["site", "search-site"]
+              for directory in ["resource-details", "filterings", "edits"])]:
+        (working_directory / directory).mkdir(parents=True, exist_ok=True)
+    return [
+        ("resource-list",
+         [executable, str(_RESOURCE_LIST_PATH), "resource-list",
+          str(master_document)],
+         {}),
+        ("resource-details",
+         [executable, str(_RESOURCE_LIST_PATH), "resource-details",
+          str(master_document)],
+         {"RESOURCE_DETAILS_PATH": "resource-details"}),
+        ("filterings",
+         [executable, str(_RESOURCE_LIST_PATH), "filterings",
+          str(master_document)],
+         {"FILTERINGS_PATH": "filterings"}),
+        ("edit-resource",
+         [executable, str(_RESOURCE_LIST_PATH), "edit-resource",
+          str(master_document)],
+         {"EDITS_PATH": "edits", "BACKEND_URL": _BACKEND_URL}),
+        ("build-all",
+         [executable, str(_RESOURCE_LIST_PATH), "build-all",
+          str(master_document)],
+         {"SITE_PATH": "site",
+          "ADD_BACKEND_URL": _BACKEND_URL,
+          "EDIT_BACKEND_URL": _BACKEND_URL}),
+        ("search-index",
+         [executable, str(_RESOURCE_LIST_PATH), "build-all",
+          "--search-index", str(master_document)],
+         {"SITE_PATH": "search-site",
+          "ADD_BACKEND_URL": _BACKEND_URL,
+          "EDIT_BACKEND_URL": _BACKEND_URL}),
+        ("update add",
+         [executable, str(_UPDATE_MASTER_DOCUMENT_PATH), "add",
+          _form_submission(added_row)],
+         {}),
+        ("update edit",
+         [executable, str(_UPDATE_MASTER_DOCUMENT_PATH), "edit",
+          _form_submission(edited_row)],
+         {})
+    ]
+
+
+def _run_benchmarks(
+        rows: int, seed: int, repeat: int) -> list[dict[str, object]]:
+    results: list[dict[str, object]] = []
+    with TemporaryDirectory() as directory:
+        working_directory = Path(directory)
+        (working_directory / "master-document").mkdir()
+        master_document = working_directory / "master-document" / \
+            "resource_list.csv"
+        original = working_directory / "original.csv"
+        write_synthetic_master_document(original, rows, seed)
+        for name, command, extra_environment in _benchmarks(
+                working_directory, rows, seed):
+            timings = []
+            for _ in range(repeat):
+                # The updates change the master document, so every run
+                # starts from the original
+                copyfile(original, master_document)
+                timings.append(
+                    _time(command, working_directory, extra_environment))
+            seconds = min(seconds for seconds, _ in timings)
+            peak_memory = max(peak_memory for _, peak_memory in timings)
+            results.append({
+                "rows": rows,
+                "benchmark": name,
+                "seconds": round(seconds, 4),
+                "peak_memory_kib": peak_memory
+            })
+            print(f"{rows:>9} {name:<17} {seconds:>10.3f} "
+                  f"{peak_memory / 1024:>10.1f}")
+            if name == "search-index":
+                results[-1]["largest_search_file_bytes"] = \
+                    _largest_search_file(working_directory / "search-site")
+    for result in results:
+        if "largest_search_file_bytes" in result:
+            print(f"{result["rows"]:>9} largest search index file: "
+                  f"{result["largest_search_file_bytes"] / 1024:.1f} KiB")
+    return results
+
+
+def _largest_search_file(path_to_site: Path) -> int:
+    """
+    The size in bytes of the largest file of the search index, which should
+    stay the same however many rows the master document has
+    """
+    return max(
+        (path.stat().st_size
+         for path in (path_to_site / "search").rglob("*.json")),
+        default=0)
+
+
+def _commit() -> str:
+    completed = run(
+        ["git", "describe", "--always", "--dirty"],
+        cwd=_SCRIPTS_PATH,
+        capture_output=True,
+        text=True,
+        check=False)
+    return completed.stdout.strip() or "unknown"
+
+
+def _compare(
+        results: list[dict[str, object]], previous: dict[str, object]) -> None:
+    previous_results = {
+        (result["rows"], result["benchmark"]): result
+        for result in previous["results"]}
+    print(f"\nCompared with {previous["commit"]} (ratio of new to old):")
+    print(f"{"rows":>9} {"benchmark":<17} {"time":>10} {"memory":>10}")
+    for result in results:
+        old = previous_results.get((result["rows"], result["benchmark"]))
+        if old is None:
+            continue
+        print(f"{result["rows"]:>9} {result["benchmark"]:<17} "
+              f"{result["seconds"] / max(old["seconds"], 1e-9):>10.2f} "
+              f"{result["peak_memory_kib"] / old["peak_memory_kib"]:>10.2f}")
+
+
+def _arguments_parser() -> ArgumentParser:
+    argument_parser = ArgumentParser(
+        description=(
+            "Times the generation of the website and the updating of the "
+            "master document against synthetic master documents of "
+            "increasing size"))
+    argument_parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=[1000, 10000],
+        help="Numbers of rows of the synthetic master documents. Defaults to "
+             "1000 and 10000; 100000 and 1000000 take far longer, and need "
+             "room for a page per row for each of the resource details and "
+             "edit pages")
+    argument_parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed from which the synthetic master documents are generated, "
+             "so that runs with the same seed are comparable. Defaults to 0")
+    argument_parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Number of runs of each benchmark, of which the fastest time "
+             "and the largest peak memory are reported. Defaults to 1")
+    argument_parser.add_argument(
+        "--output",
+        type=Path,
+        help="Path of a JSON file in which to save the results")
+    argument_parser.add_argument(
+        "--compare",
+        type=Path,
+        help="Path of a JSON file of results saved previously with --output, "
+             "with which to compare")
+    argument_parser.add_argument(
+        "--synthetic-only",
+        type=Path,
+        metavar="PATH",
+        help="Only write a synthetic master document of the first number of "
+             "rows to the given path, without running any benchmark")
+    return argument_parser
+
+
+def _main() -> None:
+    arguments = _arguments_parser().parse_args()
+    if arguments.synthetic_only is not None:
+        write_synthetic_master_document(
+            arguments.synthetic_only, arguments.rows[0], arguments.seed)
+        return
+    print(f"{"rows":>9} {"benchmark":<17} {"seconds":>10} {"peak MiB":>10}")
+    results = []
+    for rows in arguments.rows:
+        results.extend(
+            _run_benchmarks(rows, arguments.seed, arguments.repeat))
+    report = {
+        "commit": _commit(),
+        "python": python_version(),
+        "seed": arguments.seed,
+        "results": results
+    }
+    if arguments.output is not None:
+        arguments.output.write_text(
+            to_json(report, indent=2) + "\n", encoding="utf-8")
+    if arguments.compare is not None:
+        _compare(
+            results,
+            from_json(arguments.compare.read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    _main()
@@ -8,23 +8,73 @@ method. The body of the POST is passed to a github action in the
 RiC-ResourceList repository at GitHub, triggered by an API call which requires
 authentication. This authentication relies upon a private key for the AWS
 Lambda which has to be included as a separate file
-'egad_github_app_private_key.pem'.
+'egad_github_app_private_key.pem'. The tokens obtained with it are kept for as
+long as the Lambda stays warm, until shortly before they expire, as are the
+connections to the GitHub API.
+
+If the environment variable DEFERRED_DISPATCH is set to 'true', a valid
+submission is instead put on a queue, kept as a file for each submission in
+the directory given by the environment variable SUBMISSION_QUEUE_PATH, and the
+user redirected at once, without waiting for GitHub. The queued submissions
+are passed on to GitHub, with retries, by drain_handler, which is to be
+invoked separately (e.g. every minute by a schedule). For the queue to outlive
+the instance of the Lambda which wrote it, the directory must be on a file
+system shared by the instances, such as EFS: the Lambda fails to start if
+DEFERRED_DISPATCH is 'true' and SUBMISSION_QUEUE_PATH is not set, or is in
+/tmp, which is neither shared nor kept.
+
+To keep cold starts short, the modules which are not needed by every
+invocation are only imported when first needed, boto3 in particular, as is the
+private key only read when first needed.
 """
 
 from base64 import b64decode as base64_decode
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from time import time
-from typing import Callable
-
-from boto3 import client
-from jwt import encode
-from requests import post as post_request, HTTPError
+from functools import cache
+from json import dumps as to_json, loads as from_json
+from os import environ, utime
+from pathlib import Path
+from secrets import token_hex
+from time import sleep, time, time_ns
+from typing import Callable, Protocol, TYPE_CHECKING
+from urllib.parse import parse_qs as parse_form_data
+
+if TYPE_CHECKING:
+    from requests import ConnectionError as RequestsConnectionError, \
+        Response, Session
 
 MAX_INVOCATIONS_PER_HOUR = 50
 MAX_INVOCATIONS_PER_DAY = 200
 
+GITHUB_API_URL = "https://api.github.com"
+
+# Tokens are renewed this many seconds before they expire, so that they do not
+# expire during the request which uses them
+TOKEN_EXPIRY_MARGIN = 60
+
+DEFERRED_DISPATCH = environ.get("DEFERRED_DISPATCH") == "true"
+
+# Number of attempts at passing a queued submission on to GitHub, the first
+# retry being made after RETRY_DELAY seconds, and each further one after twice
+# as long as the previous one
+DISPATCH_ATTEMPTS = 4
+RETRY_DELAY = 2
+
+# Statuses with which GitHub rejects a submission itself, which would be
+# rejected again if retried. Other errors, e.g. a 403 when rate limited, or a
+# 404 if the app has lost access to the repository, are retried, so that a
+# submission is never dropped for a fault which is not its own
+REJECTION_STATUS_CODES = {400, 422}
 
+# Number of seconds after which a submission claimed by drain_handler and
+# still neither passed on nor put back is assumed to have been abandoned, e.g.
+# because the Lambda timed out, and is put back on the queue. The longest an
+# invocation of a Lambda can last
+CLAIM_TIMEOUT = 900
+
+
+@cache
 def _egad_github_app_private_key() -> str:
     with open(
             "egad_github_app_private_key.pem",
@@ -34,7 +84,6 @@ def _egad_github_app_private_key() -> str:
 
 
 EGAD_GITHUB_APP_CLIENT_ID = "Iv23li07sxNURUZ9Ixgf"
-EGAD_GITHUB_APP_PRIVATE_KEY = _egad_github_app_private_key()
 
 type Json = dict[str, Json | int | str | bool | None | float]
 FormSubmission = str
@@ -54,6 +103,20 @@ class InvalidPathException(Exception):
     """
 
 
+class InvalidSubmissionException(Exception):
+    """
+    Thrown if the body of the POST is not a form submission, or is a form
+    submission for editing a resource which does not give its id
+    """
+
+
+class MissingSubmissionQueueException(Exception):
+    """
+    Thrown if DEFERRED_DISPATCH is 'true' but SUBMISSION_QUEUE_PATH is not set
+    to a directory which outlives the instance of the Lambda
+    """
+
+
 class TooManyInvocationsThisHourException(Exception):
     """
     Thrown if too many invocations have been made during the present hour
@@ -66,12 +129,16 @@ class TooManyInvocationsThisDayException(Exception):
     """
 
 
-def _generate_jwt_token(private_key: str) -> Token:
+def _generate_jwt_token(private_key: str, now: float) -> tuple[Token, int]:
     """
      See https://docs.github.com/en/apps/creating-github-apps/authenticating-with-a-github-app/generating-a-json-web-token-jwt-for-a-github-app # pylint: disable=line-too-long
+    Returns the token and the time at which it expires. The time at which it
+    is issued is set 60 seconds in the past to allow for clock drift, as
+    GitHub recommends.
     """
-    issued_at_time = int(time())
-    expiration_time = issued_at_time + 60  # 1 minute (10 minutes is the max)
+    from jwt import encode  # pylint: disable=import-outside-toplevel
+    issued_at_time = int(now) - 60
+    expiration_time = issued_at_time + 600  # 10 minutes, the max
     return encode(
         {
             "iat": issued_at_time,
@@ -80,28 +147,33 @@ def _generate_jwt_token(private_key: str) -> Token:
         },
         private_key,
         algorithm="RS256"
-    )
+    ), expiration_time
 
 
-def _generate_installation_token(jwt_token: Token) -> Token:
+def _generate_installation_token(jwt_token: Token) -> tuple[Token, float]:
     """
     Here 64136623 is the 'installation ID' of the RiC-ResourceList installation
-    of the app, obtainable by a GET request to /installations.
+    of the app, obtainable by a GET request to /installations. Returns the
+    token and the time at which it expires (an hour after it is generated).
     """
-    response = post_request(
-        "https://api.github.com/app/installations/64136623/access_tokens",
+    response = _post_to_github(
+        f"{GITHUB_API_URL}/app/installations/64136623/access_tokens",
         headers={
             "Accept": "application/vnd.github+json",
             "Authorization": f"Bearer {jwt_token}",
             "X-GitHub-Api-Version": "2022-11-28"
-        },
-        timeout=45
+        }
     )
     response.raise_for_status()
-    return response.json()["token"]
+    installation_token = response.json()
+    return installation_token["token"], datetime.fromisoformat(
+        installation_token["expires_at"]).timestamp()
 
 
 def _disable_lambda() -> None:
+    # Only needed in the rare case that the Lambda is invoked too often, and
+    # slow to import
+    from boto3 import client  # pylint: disable=import-outside-toplevel
     aws_client = client("lambda")
     aws_client.put_function_concurrency(
         FunctionName="resource-list-submission",
@@ -150,6 +222,69 @@ class Limiter:
             raise TooManyInvocationsThisDayException
 
 
+@dataclass
+class TokenCache:
+    """
+    Keeps the JWT of the GitHub app, and the installation token obtained with
+    it, across invocations of the Lambda for as long as it stays warm, renewing
+    each shortly before it expires, or when GitHub rejects it
+    """
+    clock: Callable[[], float] = time
+    jwt_token: Token | None = None
+    jwt_token_expiration_time: float = 0
+    installation_token: Token | None = None
+    installation_token_expiration_time: float = 0
+
+    def _is_valid(self, token: Token | None, expiration_time: float) -> bool:
+        return token is not None and \
+            self.clock() < expiration_time - TOKEN_EXPIRY_MARGIN
+
+    def jwt(self) -> Token:
+        """
+        The cached JWT, or a new one if it has expired or is about to
+        """
+        if not self._is_valid(self.jwt_token, self.jwt_token_expiration_time):
+            self.jwt_token, self.jwt_token_expiration_time = \
+                _generate_jwt_token(
+                    _egad_github_app_private_key(), self.clock())
+        return self.jwt_token
+
+    def installation(self) -> Token:
+        """
+        The cached installation token, or a new one if it has expired or is
+        about to. A new installation token is requested with a new JWT if
+        GitHub rejects the cached JWT
+        """
+        # pylint: disable=import-outside-toplevel
+        from requests import HTTPError
+        if self._is_valid(
+                self.installation_token,
+                self.installation_token_expiration_time):
+            print("Reusing the cached installation token")
+            return self.installation_token
+        try:
+            self.installation_token, \
+                self.installation_token_expiration_time = \
+                _generate_installation_token(self.jwt())
+        except HTTPError as exception:
+            if exception.response is None or \
+                    exception.response.status_code != 401:
+                raise
+            print("JWT rejected by GitHub, generating a new one")
+            self.jwt_token = None
+            self.installation_token, \
+                self.installation_token_expiration_time = \
+                _generate_installation_token(self.jwt())
+        return self.installation_token
+
+    def invalidate(self) -> None:
+        """
+        Discards the cached tokens, e.g. if GitHub rejects them
+        """
+        self.jwt_token = None
+        self.installation_token = None
+
+
 def _extract_form_submission(event) -> tuple[FormSubmission, SubmissionType]:
     if event["requestContext"]["http"]["method"] != "POST":
         raise InvalidHttpMethodException
@@ -159,16 +294,108 @@ def _extract_form_submission(event) -> tuple[FormSubmission, SubmissionType]:
     path = event["requestContext"]["http"]["path"]
     if not path or path[1:] not in ["add", "edit"]:
         raise InvalidPathException
+    form_data = parse_form_data(submission)
+    if not form_data or (path[1:] == "edit" and "id" not in form_data):
+        raise InvalidSubmissionException
     return submission, path[1:]
 
 
 def _trigger_github_action(
         submission: FormSubmission,
         submission_type: SubmissionType) -> None:
-    installation_token = _generate_installation_token(_generate_jwt_token(
-        EGAD_GITHUB_APP_PRIVATE_KEY))
-    response = post_request(
-        "https://api.github.com/repos/ICA-EGAD/RiC-ResourceList/dispatches",
+    response = _post_dispatch(
+        submission, submission_type, token_cache.installation())
+    if response.status_code == 401:
+        print("Installation token rejected by GitHub, generating a new one")
+        token_cache.invalidate()
+        response = _post_dispatch(
+            submission, submission_type, token_cache.installation())
+    _log_connection_reuse()
+    response.raise_for_status()
+
+
+@cache
+def _github_session() -> "Session":
+    """
+    A session whose connection to the GitHub API is kept alive between
+    requests, and between invocations of the Lambda while it stays warm. An
+    instance of the Lambda handles one invocation at a time, so needs a single
+    connection
+    """
+    # pylint: disable=import-outside-toplevel
+    from requests import Session
+    from requests.adapters import HTTPAdapter
+    session = Session()
+    session.mount(
+        f"{GITHUB_API_URL}/",
+        HTTPAdapter(pool_connections=1, pool_maxsize=1))
+    return session
+
+
+def _connections_and_requests() -> tuple[int, int]:
+    """
+    The numbers of connections to the GitHub API opened, and of requests
+    sent, by the session since the Lambda started
+    """
+    pools = _github_session().get_adapter(
+        f"{GITHUB_API_URL}/").poolmanager.pools
+    return (
+        sum(pools[key].num_connections for key in pools.keys()),
+        sum(pools[key].num_requests for key in pools.keys()))
+
+
+def _log_connection_reuse() -> None:
+    connections, requests = _connections_and_requests()
+    print(f"Connections to the GitHub API since the Lambda started: "
+          f"{connections} opened for {requests} requests")
+
+
+def _is_closed_without_response(exception: "RequestsConnectionError") -> bool:
+    # pylint: disable=import-outside-toplevel
+    from http.client import RemoteDisconnected
+    from urllib3.exceptions import ProtocolError
+    return any(
+        isinstance(cause, ProtocolError) and any(
+            isinstance(
+                error,
+                (RemoteDisconnected, ConnectionResetError, BrokenPipeError))
+            for error in cause.args)
+        for cause in exception.args)
+
+
+def _post_to_github(
+        url: str,
+        headers: dict[str, str],
+        json: Json | None = None) -> "Response":
+    """
+    GitHub may close a connection which has been idle, which is only found out
+    when it is next used. A request which was sent on a connection kept alive
+    from a previous request, and which was closed without any response, is
+    thus sent once more, on a new connection. A request which fails in any
+    other way, e.g. by timing out after being sent, is not, since GitHub may
+    have acted on it.
+    """
+    # pylint: disable-next=import-outside-toplevel
+    from requests import ConnectionError as RequestsConnectionError
+    connections, _ = _connections_and_requests()
+    try:
+        return _github_session().post(
+            url, headers=headers, json=json, timeout=45)
+    except RequestsConnectionError as exception:
+        if _connections_and_requests()[0] != connections or \
+                not _is_closed_without_response(exception):
+            raise
+    print("Connection to the GitHub API closed while idle, sending again")
+    return _github_session().post(
+        url, headers=headers, json=json, timeout=45)
+
+
+def _post_dispatch(
+        submission: FormSubmission,
+        submission_type: SubmissionType,
+        installation_token: Token) -> "Response":
+    return _post_to_github(
+        f"{GITHUB_API_URL}/repos/ICA-EGAD/RiC-ResourceList/dispatches",
         headers={
             "Accept": "application/vnd.github+json",
             "Authorization": f"Bearer {installation_token}",
@@ -179,13 +406,276 @@ def _trigger_github_action(
             "client_payload": {
                 "form_submission": submission
             }
-        },
-        timeout=45
+        }
     )
-    response.raise_for_status()
+
+
+class SubmissionQueue(Protocol):
+    """
+    Submissions waiting to be passed on to GitHub, in the order in which they
+    were queued, each under a key. A submission is claimed before it is passed
+    on, which takes it off the queue atomically, so that drains which overlap
+    never pass on the same submission twice, and is then either removed, or
+    released back onto the queue to be tried again later
+    """
+
+    def put(self, submission: FormSubmission, action: SubmissionType) -> None:
+        """
+        Adds the submission to the end of the queue
+        """
+
+    def keys(self) -> list[str]:
+        """
+        The key of each submission on the queue which is not claimed, in the
+        order in which they were queued
+        """
+
+    def claim(self, key: str) -> Json | None:
+        """
+        Takes the submission with the given key off the queue, returning it
+        with the action, 'add' or 'edit', and the form submission. None if it
+        has already been claimed
+        """
+
+    def release(self, key: str) -> None:
+        """
+        Puts the claimed submission with the given key back on the queue
+        """
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the claimed submission with the given key for good
+        """
+
+
+def _queue_item(submission: FormSubmission, action: SubmissionType) -> Json:
+    # As in the journal of update_master_document.py
+    return {"action": action, "form_submission": submission}
+
+
+@dataclass
+class FileQueue:
+    """
+    Keeps each queued submission as a JSON file of its own in the given
+    directory, written to a temporary file first and then renamed, so that a
+    submission is either queued whole or not at all. The names of the files
+    sort in the order in which the submissions were queued. A submission is
+    claimed by renaming its file into the in-progress directory, which only
+    one of several concurrent renames can do, and is put back if it has been
+    claimed for longer than CLAIM_TIMEOUT
+    """
+    directory: Path
+    clock: Callable[[], float] = time
+
+    @property
+    def _in_progress(self) -> Path:
+        return self.directory / "in-progress"
+
+    def put(self, submission: FormSubmission, action: SubmissionType) -> None:
+        """
+        Adds the submission to the end of the queue
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"{time_ns()}-{token_hex(4)}"
+        temporary_path = self.directory / f"{name}.tmp"
+        temporary_path.write_text(
+            to_json(_queue_item(submission, action)), encoding="utf-8")
+        temporary_path.replace(self.directory / f"{name}.json")
+
+    def keys(self) -> list[str]:
+        """
+        The name of the file of each submission which is not claimed, after
+        putting back those whose claims have been abandoned
+        """
+        if not self.directory.is_dir():
+            return []
+        for path in self._in_progress.glob("*.json"):
+            try:
+                if self.clock() - path.stat().st_mtime > CLAIM_TIMEOUT:
+                    path.rename(self.directory / path.name)
+            except FileNotFoundError:
+                # Removed or put back by another drain meanwhile
+                pass
+        return [path.name for path in sorted(self.directory.glob("*.json"))]
+
+    def claim(self, key: str) -> Json | None:
+        """
+        Moves the file of the submission into the in-progress directory. None
+        if it is no longer on the queue
+        """
+        self._in_progress.mkdir(exist_ok=True)
+        try:
+            # The time of the claim, kept by the rename
+            utime(self.directory / key, (self.clock(), self.clock()))
+            (self.directory / key).rename(self._in_progress / key)
+        except FileNotFoundError:
+            return None
+        return from_json((self._in_progress / key).read_text(encoding="utf-8"))
+
+    def release(self, key: str) -> None:
+        """
+        Moves the file of the submission back onto the queue
+        """
+        try:
+            (self._in_progress / key).rename(self.directory / key)
+        except FileNotFoundError:
+            pass
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the file of the submission
+        """
+        (self._in_progress / key).unlink(missing_ok=True)
+
+
+@dataclass
+class InMemoryQueue:
+    """
+    Stand-in for FileQueue, e.g. for testing, which keeps the queued
+    submissions in memory only
+    """
+    queued: dict[str, Json] = field(default_factory=dict)
+    claimed: dict[str, Json] = field(default_factory=dict)
+    queued_so_far: int = 0
+
+    def put(self, submission: FormSubmission, action: SubmissionType) -> None:
+        """
+        Adds the submission to the end of the queue
+        """
+        self.queued_so_far += 1
+        self.queued[f"{self.queued_so_far:020}"] = _queue_item(
+            submission, action)
+
+    def keys(self) -> list[str]:
+        """
+        The key of each submission which is not claimed
+        """
+        return sorted(self.queued)
+
+    def claim(self, key: str) -> Json | None:
+        """
+        Moves the submission to the claimed submissions
+        """
+        if key not in self.queued:
+            return None
+        self.claimed[key] = self.queued.pop(key)
+        return self.claimed[key]
+
+    def release(self, key: str) -> None:
+        """
+        Moves the submission back onto the queue
+        """
+        if key in self.claimed:
+            self.queued[key] = self.claimed.pop(key)
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the submission from the claimed submissions
+        """
+        self.claimed.pop(key, None)
+
+
+def _is_rate_limited(exception: Exception) -> bool:
+    """
+    GitHub signals that it is rate limiting with a 429, or with a 403 which
+    says when to retry, or that no requests remain
+    """
+    response = getattr(exception, "response", None)
+    if response is None:
+        return False
+    return response.status_code == 429 or (
+        response.status_code == 403 and (
+            "retry-after" in response.headers or
+            response.headers.get("x-ratelimit-remaining") == "0"))
+
+
+def _is_rejection(exception: Exception) -> bool:
+    """
+    Whether GitHub has rejected the submission itself, rather than failed to
+    handle it, e.g. failures to connect, timeouts, rate limiting, and errors
+    on the side of GitHub, which may well not recur (a 401 is already retried
+    with new tokens by _trigger_github_action)
+    """
+    response = getattr(exception, "response", None)
+    return response is not None and \
+        response.status_code in REJECTION_STATUS_CODES
+
+
+def drain(
+        queue: SubmissionQueue,
+        dispatch: Callable[
+            [FormSubmission, SubmissionType], None] = _trigger_github_action,
+        wait: Callable[[float], None] = sleep) -> int:
+    """
+    Passes the queued submissions on to GitHub in the order in which they were
+    queued, claiming each first, and removing it from the queue once passed
+    on. Each is attempted up to DISPATCH_ATTEMPTS times, with a growing delay
+    in between. If a submission still cannot be passed on, or GitHub is rate
+    limiting, it is released back onto the queue, and it and the ones after it
+    are left to be attempted again when the queue is next drained. A
+    submission which GitHub rejects outright is removed from the queue, and
+    logged so that it is not lost. Stops if a submission has been claimed by
+    another drain, which is passing on the queue meanwhile. Returns the number
+    of submissions left on the queue
+    """
+    # pylint: disable=import-outside-toplevel
+    from requests import RequestException
+    keys = queue.keys()
+    for number, key in enumerate(keys):
+        item = queue.claim(key)
+        if item is None:
+            print(f"Queued submission {key} claimed by another drain")
+            return len(keys) - number
+        for attempt in range(DISPATCH_ATTEMPTS):
+            try:
+                dispatch(item["form_submission"], item["action"])
+            except RequestException as exception:
+                print(f"Attempt {attempt + 1} at passing on queued "
+                      f"submission {key} failed: {exception}")
+                if _is_rejection(exception):
+                    print(f"Submission rejected by GitHub, removing it from "
+                          f"the queue. Submission: {item}")
+                    queue.remove(key)
+                    break
+                if _is_rate_limited(exception):
+                    print("Rate limited by GitHub, leaving the queue for "
+                          "later")
+                    queue.release(key)
+                    return len(keys) - number
+                if attempt + 1 < DISPATCH_ATTEMPTS:
+                    wait(RETRY_DELAY * 2**attempt)
+            else:
+                print(f"Successfully passed queued submission {key} to "
+                      f"GitHub! Submission type: {item["action"]}")
+                queue.remove(key)
+                break
+        else:
+            queue.release(key)
+            return len(keys) - number
+    return 0
+
+
+def _submission_queue() -> SubmissionQueue | None:
+    """
+    The queue in the directory given by SUBMISSION_QUEUE_PATH, if set. Raises
+    MissingSubmissionQueueException if DEFERRED_DISPATCH is 'true' and the
+    directory is not set, or is in /tmp, which is only kept for as long as the
+    instance of the Lambda, so that submissions are not lost with it
+    """
+    path = environ.get("SUBMISSION_QUEUE_PATH")
+    if path is not None and \
+            Path(path).resolve().is_relative_to(Path("/tmp").resolve()):
+        path = None
+    if path is None:
+        if DEFERRED_DISPATCH:
+            raise MissingSubmissionQueueException
+        return None
+    return FileQueue(Path(path))
 
 
 limiter = Limiter()
+token_cache = TokenCache()
+submission_queue = _submission_queue()
 
 
 def lambda_handler(event, _) -> Json:
@@ -237,10 +727,48 @@ def lambda_handler(event, _) -> Json:
             },
             "body": "Called with path that is not /add or /edit"
         }
+    except InvalidSubmissionException:
+        print(f"Invalid submission: {event["body"]}")
+        return {
+            "statusCode": 303,
+            "headers": {
+                "Location": failure_url
+            },
+            "body": "Called with a body that is not a form submission, or "
+                    "with an edit that does not give the id of the resource"
+        }
+    if submission_queue is not None and DEFERRED_DISPATCH:
+        try:
+            submission_queue.put(submission, submission_type)
+        except OSError as exception:
+            print(f"Failed to queue submission: {exception}")
+            return {
+                "statusCode": 303,
+                "headers": {
+                    "Location": failure_url
+                },
+                "body": "An error occurred when queueing the submission for "
+                        "adding or editing a resource in github"
+            }
+        print(f"Queued for passing on to GitHub! Submission type: "
+              f"{submission_type}. Submission: {submission}")
+        return {
+            "statusCode": 303,
+            "headers": {
+                "Location": f"{root_redirect_url}/{
+                    submission_type}_success.html"
+            },
+            "body": "Successfully queued form submission for passing on to "
+                    "GitHub"
+        }
+    # Only imported once a submission is to be passed on
+    # pylint: disable=import-outside-toplevel
+    from requests import RequestException
     try:
         _trigger_github_action(submission, submission_type)
-    except HTTPError as exception:
-        print(f"HTTPError: {exception}")
+    except RequestException as exception:
+        # An HTTPError, or a failure to connect to GitHub
+        print(f"{type(exception).__name__}: {exception}")
         return {
             "statusCode": 303,
             "headers": {
@@ -258,3 +786,15 @@ def lambda_handler(event, _) -> Json:
         },
         "body": "Successfully passed on form submission to GitHub"
     }
+
+
+def drain_handler(_, __) -> Json:
+    """
+    Function called by AWS when the Lambda is invoked to pass the queued
+    submissions on to GitHub, e.g. by a schedule
+    """
+    if submission_queue is None:
+        raise MissingSubmissionQueueException
+    remaining = drain(submission_queue)
+    print(f"Submissions left on the queue: {remaining}")
+    return {"remaining": remaining}
@@ -5,22 +5,48 @@ into several sub-commands which generate different parts of the website.
 
 # pylint: disable=too-many-lines
 
-from argparse import ArgumentParser
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from csv import DictReader
+from dataclasses import asdict, dataclass, field, replace as with_fields
 from datetime import datetime, timezone
+from filecmp import cmp as compare_files
+from functools import cache, partial, wraps
+from gzip import compress as gzip_compress
+from hashlib import sha256
+from heapq import heappush, heappushpop
+from itertools import chain, count
+from json import dumps as to_json, loads as from_json
 from os import environ
 from pathlib import Path
-from re import match as regex_match, split as regex_split
+from re import IGNORECASE, Match, compile as regex_compile
 from string import Template
-from sys import exit as sys_exit
-from typing import Any, Callable, Generator, TypeVar
-from urllib.parse import urlparse as parse_url
+from sys import exit as sys_exit, intern, stderr, stdout
+from time import perf_counter
+from tracemalloc import (
+    get_traced_memory, start as start_tracing, stop as stop_tracing)
+from typing import Any, Callable, Generator, Iterable, TypeVar
+from unicodedata import combining, normalize
+
+from update_master_document import journal_entries, with_journal
+
+try:
+    from brotli import compress as brotli_compress
+except ImportError:
+    brotli_compress = None  # pylint: disable=invalid-name
 
 CSS_FILE_NAME = "ric_resources.css"
 EDITS_DIRECTORY_NAME = "edits"
+FILTERINGS_DIRECTORY_NAME = "filterings"
 ICONS_DIRECTORY_NAME = "icons"
 LOGO_FILE_NAME = "EGAD_logo.svg"
+MANIFEST_FILE_NAME = "build_manifest.json"
+FACETS_DIRECTORY_NAME = "facets"
 RESOURCE_DETAILS_DIRECTORY_NAME = "resource-details"
+SEARCH_DIRECTORY_NAME = "search"
+YEARS_DIRECTORY_NAME = "years"
 
 _site_template = Template("""<!DOCTYPE html>
 <html lang="en">
@@ -58,6 +84,23 @@ _RESOURCE_LIST_INTRODUCTION_HTML = """
       <p>This list includes only a few details for each resource (e.g. not a full bibliographic reference in the case of articles) but more details can be obtained by clicking on a resource. The buttons below can be used to filter by resource type.</p>
     </div>"""
 
+_facet_introduction_html_template = Template("""
+    <div class="introduction">
+      <p>Resources in the list $description, sorted reverse chronologically. The buttons below can be used to filter the whole list by resource type.</p>
+    </div>""")  # pylint: disable=line-too-long
+
+_FACETS_INTRODUCTION_HTML = """
+    <div class="introduction">
+      <p>The resources in the list can be browsed by the languages in which they are available, the parts of RiC which they concern, the year in which they first appeared, or the people and organisations responsible for them. The number of resources is given after each entry.</p>
+    </div>"""  # pylint: disable=line-too-long
+
+_facets_html_template = Template("""    <div class="facets">$facets
+    </div>""")
+
+_facet_html_template = Template("""
+      <h2 class="facet">$label</h2>
+      <p class="facet-values">$values</p>""")
+
 _RESOURCE_DETAILS_INTRODUCTION_HTML = """    <div class="introduction">
       <p>Use the green button to edit the resource (moderated: it may take a few days before changes appear).</p>
     </div>"""
@@ -101,7 +144,7 @@ _filter_menu_components = {
 _resource_list_html_template = Template(
     """    <div class="resource-list" id="resource-list">
       <ul class="resource-list">$list_entries
-      </ul>
+      </ul>$navigation
     </div>
     <div class="last-updated">
       <p>Last updated: <span class="last-updated-timestamp">$last_updated</a></p>
@@ -236,7 +279,8 @@ Version = str
 Word = str
 URL = str
 
-T = TypeVar("T", tuple[HTML, ResourceId], tuple[HTML, Date, ResourceType])
+S = TypeVar("S")
+T = TypeVar("T")
 
 _type = {
     "article": "Journal article",
@@ -294,15 +338,296 @@ class NotALinkException(ValueError):
     def __init__(self, message: str) -> None:
         super().__init__(message)
 
-def _current_timestamp() -> str:
-    return datetime.strftime(datetime.now(timezone.utc), "%Y-%m-%d %H:%M (GMT)")
+class _Metrics:
+    """
+    Wall times and numbers of calls of the stages of a build and of the
+    functions which do the work (parsing, rendering, writing), together with
+    the slowest rows to render, and the number of bytes written. Nothing is
+    recorded unless enabled, e.g. by the --profile option.
+    """
+
+    # Number of the slowest rows to report
+    SLOWEST_ROWS = 10
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.stages: dict[str, list[float]] = {}
+        self.functions: dict[str, list[float]] = {}
+        self.slowest_rows: list[tuple[float, str, str]] = []
+        self.files_written = 0
+        self.files_unchanged = 0
+        self.bytes_written = 0
+
+    def reset(self, enabled: bool) -> None:
+        """
+        Discards everything recorded so far
+        """
+        self.__init__()  # pylint: disable=unnecessary-dunder-call
+        self.enabled = enabled
+
+    @contextmanager
+    def stage(self, name: str) -> Generator[None, None, None]:
+        """
+        Records the time spent in the body of the with statement as a stage
+        """
+        if not self.enabled:
+            yield
+            return
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self._add(self.stages, name, perf_counter() - start, 1)
+
+    def record_call(
+            self,
+            name: str,
+            seconds: float,
+            resource_id: ResourceId | None = None) -> None:
+        self._add(self.functions, name, seconds, 1)
+        if resource_id is not None:
+            self._add_row((seconds, name, resource_id))
+
+    def record_write(self, written: bool, size: int = 0) -> None:
+        if written:
+            self.files_written += 1
+            self.bytes_written += size
+        else:
+            self.files_unchanged += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Everything recorded, in a form which can be saved as JSON, or sent
+        from a worker process to be merged into the metrics of the main one
+        """
+        return {
+            "stages": self._timings(self.stages),
+            "functions": self._timings(self.functions),
+            "slowest_rows": [
+                {"function": name, "id": resource_id, "seconds": seconds}
+                for seconds, name, resource_id in sorted(
+                    self.slowest_rows, reverse=True)],
+            "files_written": self.files_written,
+            "files_unchanged": self.files_unchanged,
+            "bytes_written": self.bytes_written
+        }
+
+    def merge(self, snapshot: dict[str, Any]) -> None:
+        for timings, snapshot_timings in [
+                (self.stages, snapshot["stages"]),
+                (self.functions, snapshot["functions"])]:
+            for name, timing in snapshot_timings.items():
+                self._add(timings, name, timing["seconds"], timing["calls"])
+        for row in snapshot["slowest_rows"]:
+            self._add_row((row["seconds"], row["function"], row["id"]))
+        self.files_written += snapshot["files_written"]
+        self.files_unchanged += snapshot["files_unchanged"]
+        self.bytes_written += snapshot["bytes_written"]
+
+    @staticmethod
+    def _add(
+            timings: dict[str, list[float]],
+            name: str,
+            seconds: float,
+            calls: int) -> None:
+        timing = timings.setdefault(name, [0.0, 0])
+        timing[0] += seconds
+        timing[1] += calls
+
+    def _add_row(self, row: tuple[float, str, str]) -> None:
+        if len(self.slowest_rows) < self.SLOWEST_ROWS:
+            heappush(self.slowest_rows, row)
+        else:
+            heappushpop(self.slowest_rows, row)
+
+    @staticmethod
+    def _timings(
+            timings: dict[str, list[float]]) -> dict[str, dict[str, float]]:
+        return {
+            name: {"seconds": round(seconds, 6), "calls": int(calls)}
+            for name, (seconds, calls) in sorted(
+                timings.items(), key=lambda item: -item[1][0])}
+
+
+_metrics = _Metrics()
+
+
+def _profiled(function: Callable[..., T]) -> Callable[..., T]:
+    """
+    Records the wall time of each call of the function if metrics are
+    enabled, and, for a function of a resource, which resource it was called
+    for. The time includes that of any profiled function called within it.
+    """
+    name = function.__qualname__
+
+    @wraps(function)
+    def profiled(*arguments: Any, **keyword_arguments: Any) -> T:
+        if not _metrics.enabled:
+            return function(*arguments, **keyword_arguments)
+        start = perf_counter()
+        try:
+            return function(*arguments, **keyword_arguments)
+        finally:
+            _metrics.record_call(
+                name,
+                perf_counter() - start,
+                next((argument.id for argument in arguments
+                      if isinstance(argument, Resource)), None))
+
+    return profiled
+
+
+def _profiled_call(
+        processor: Callable[[S], T], item: S) -> tuple[T, dict[str, Any]]:
+    """
+    Calls the processor in a worker process with metrics enabled, returning
+    the metrics along with the result, to be merged into those of the main
+    process
+    """
+    _metrics.reset(enabled=True)
+    return processor(item), _metrics.snapshot()
+
+
+_PLACEHOLDER_DELIMITER = "\0"
+
+
+def _placeholder(name: str) -> str:
+    return f"{_PLACEHOLDER_DELIMITER}{name}{_PLACEHOLDER_DELIMITER}"
+
+
+def _placeholders(*names: str) -> dict[str, str]:
+    return {name: _placeholder(name) for name in names}
+
+
+# pylint: disable=too-few-public-methods
+class _PrebuiltHTML:
+    """
+    HTML in which everything which is the same for every page of a kind (the
+    header, logo, RiC links, menus, and so on) has been substituted once,
+    leaving placeholders for the parts which vary from page to page. Rendering
+    a page then only joins the prebuilt fragments with the varying parts.
+    """
+
+    __slots__ = ("fragments", "names", "_minified")
+
+    def __init__(self, html_with_placeholders: HTML) -> None:
+        parts = html_with_placeholders.split(_PLACEHOLDER_DELIMITER)
+        self.fragments = parts[0::2]
+        self.names = parts[1::2]
+        self._minified: _PrebuiltHTML | None = None
+
+    def minified(self) -> "_PrebuiltHTML":
+        """
+        The same HTML with the whitespace used for layout collapsed, computed
+        only once. The values filled in are left as they are.
+        """
+        if self._minified is None:
+            minified = _PrebuiltHTML("")
+            minified.fragments = [
+                _minified(fragment) for fragment in self.fragments]
+            minified.names = self.names
+            self._minified = minified
+        return self._minified
+
+    @_profiled
+    def render(self, **values: str) -> HTML:
+        """
+        Fills in each placeholder with the value of the same name
+        """
+        parts = [self.fragments[0]]
+        for name, fragment in zip(self.names, self.fragments[1:]):
+            parts.append(values[name])
+            parts.append(fragment)
+        return "".join(parts)
+
+    def stream(
+            self,
+            **values: str | Iterable[str]) -> Generator[HTML, None, None]:
+        """
+        As render, but yields the HTML piece by piece. A value may be an
+        iterable of strings rather than a string, in which case they are
+        yielded one at a time in place of the placeholder.
+        """
+        yield self.fragments[0]
+        for name, fragment in zip(self.names, self.fragments[1:]):
+            value = values[name]
+            if isinstance(value, str):
+                yield value
+            else:
+                yield from value
+            yield fragment
+
+
+# Whitespace between block level elements is not rendered, and elsewhere a
+# run of whitespace is rendered as a single space. A match only starts at a
+# block level tag or at the first character of a run of whitespace, so that
+# each run is scanned once rather than once from each of its characters, and a
+# tag is not looked for beyond the next <, so that the text after a tag which
+# is never closed is not scanned again from every such tag
+_BLOCK_LEVEL_TAGS = (
+    "html|head|body|meta|link|title|script|div|form|fieldset|legend|h1|h2|ul"
+    "|li|p")
+
+_layout_whitespace_pattern = regex_compile(
+    rf"(?:(?P<tag_before></?(?:{_BLOCK_LEVEL_TAGS})\b[^<>]*>)|(?<!\s))"
+    rf"[^\S\n]*\n\s*"
+    rf"(?=(?P<tag_after></?(?:{_BLOCK_LEVEL_TAGS})\b)?)")
+
+
+@_profiled
+def _minified(html: HTML) -> HTML:
+    """
+    Collapses every run of whitespace which spans a line, removing it where
+    it is next to a block level tag. Must not be applied to the content of a
+    textarea, in which whitespace is significant.
+    """
+    return _layout_whitespace_pattern.sub(_collapsed, html)
+
+
+def _collapsed(match: Match[str]) -> str:
+    tag_before = match["tag_before"]
+    if tag_before is not None:
+        return tag_before
+    return "" if match["tag_after"] is not None else " "
+
+
+def _timestamp(seconds_since_epoch: float) -> str:
+    return datetime.strftime(
+        datetime.fromtimestamp(seconds_since_epoch, timezone.utc),
+        "%Y-%m-%d %H:%M (GMT)")
+
+
+def _last_modified(path_to_csv: Path) -> str:
+    """
+    Used as the 'last updated' timestamp of the resource list, so that
+    re-generating the site without changing the master document gives
+    identical pages. Submissions recorded in the journal of the master
+    document count as changes to it
+    """
+    return _timestamp(max(
+        path.stat().st_mtime
+        for path in [path_to_csv, *journal_entries(path_to_csv)]))
+
+
+# The patterns below are chosen so that matching runs in time linear in the
+# length of the text, however it is crafted: the text of a Markdown link cannot
+# contain brackets and its URL cannot contain whitespace or unbalanced
+# parentheses, so an attempt at a match starting from a given [ never reads
+# past the next bracket, parenthesis, or whitespace, and bare URLs are only
+# looked for at the start of a word.
+_url_scheme_pattern = regex_compile(r"\s*(?:https?|ftp):", IGNORECASE)
+
+_markdown_link_pattern = regex_compile(
+    r"\[(?P<text>[^\[\]\n]+)\]\((?P<url>(?:[^()\s]|\([^()\s]*\))+)\)")
+
+_link_pattern = regex_compile(
+    rf"{_markdown_link_pattern.pattern}"
+    r"|(?<!\S)(?P<bare_url>(?:https?|ftp):\S+)",
+    IGNORECASE)
 
 
 def _is_link(word: str) -> bool:
-    try:
-        return parse_url(word).scheme in ["http", "https", "ftp"]
-    except ValueError:
-        return False
+    return _url_scheme_pattern.match(word) is not None
 
 
 def _to_link(word: str | None, url: str, css_class: str | None = None) -> str:
@@ -324,23 +649,31 @@ def _links_in_text(text: str) -> Generator[Word, None, None]:
     """
     Two kinds of syntax are supported.
 
-    1) If a 'word' (something between spaces) parses to a URL whose scheme is
+    1) If a 'word' (something between whitespace) is a URL whose scheme is
     http, https, or ftp, then it is converted to a link whose text is the same
     as the URL. If a word ends in '.', ',', ';', '\n', ';', ':', then we
     regard the URL as terminating at the character before this.
-    2) If a 'word' is of the form [...], where ... does not contain ], would be
-    converted to a link according to 1), then the previous word is converted to
-    a link whose underlying URL is ... .
-    """
-    text = " ".join(_to_link(None, word) if _is_link(word) else word
-                    for word in text.split(" "))
-    for part in regex_split(r"(\[.+?\]\(.+?\))", text):
-        match = regex_match(r"\[(.+?)\]\((.+?)\)", part)
-        if match is not None:
-            if _is_link(match.group(2)):
-                yield f"<a href='{match.group(2)}'>{match.group(1)}</a>"
-                continue
-        yield part
+    2) Markdown syntax [text](url), where text does not contain [ or ], and url
+    is a URL in the sense of 1), is converted to a link with the given text.
+
+    The text is tokenised in a single pass, in time linear in its length.
+    """
+    position = 0
+    for match in _link_pattern.finditer(text):
+        yield text[position:match.start()]
+        position = match.end()
+        if match["bare_url"] is not None:
+            yield _to_link(None, match["bare_url"])
+        elif _is_link(match["url"]):
+            yield f"<a href='{match["url"]}'>{match["text"]}</a>"
+        else:
+            yield match[0]
+    yield text[position:]
+
+
+@_profiled
+def _with_links(text: str) -> HTML:
+    return "".join(_links_in_text(text))
 
 
 def _split_by_language(text: str) -> Generator[HTML, None, None]:
@@ -357,10 +690,9 @@ def _split_by_language(text: str) -> Generator[HTML, None, None]:
                 raise ValueError(
                     "The following is not a recognised language: "
                     f"{language}. Occurs in: {language_part}")
-            language_part = "".join(
-                _links_in_text(language_part[:-4].rstrip()))
+            language_part = _with_links(language_part[:-4].rstrip())
         else:
-            language_part = "".join(_links_in_text(language_part))
+            language_part = _with_links(language_part)
         for paragraph in language_part.split("\n\n"):
             paragraph = paragraph.strip()
             if changed_language:
@@ -376,8 +708,57 @@ def _split_by_language(text: str) -> Generator[HTML, None, None]:
                 yield f"<p>{paragraph}</p>"
         changed_language = True
 
-def _description(row: Row) -> Generator[HTML, None, None]:
-    yield from _split_by_language(row["description"])
+# pylint: disable=too-many-instance-attributes,too-few-public-methods
+class Resource:
+    """
+    A row of the master document, parsed once and shared by all the pages
+    which are generated from it. The values of the columns are kept verbatim
+    (the edit pages need them as they are), alongside the parsed title,
+    responsible entities, dates, languages, and parts of RiC. Values drawn from
+    a small vocabulary (types, languages, parts of RiC) are interned, so that
+    they are shared between resources.
+    """
+
+    __slots__ = (
+        "id", "title", "responsible", "description", "publication_date",
+        "type", "links", "languages", "relevant_parts_of_ric", "prospects",
+        "contact", "related_to", "display_title", "alternative_title",
+        "responsible_entries", "versioned_dates", "language_entries",
+        "ric_parts", "referenced_by")
+
+    def __init__(self, row: Row) -> None:
+        self.id: ResourceId = row["id"]
+        self.title = row["title"]
+        self.responsible = row["responsible"]
+        self.description = row["description"]
+        self.publication_date = row["publication_date"]
+        self.type: ResourceType = intern(row["type"])
+        self.links = row["links"]
+        self.languages = intern(row["languages"])
+        self.relevant_parts_of_ric = intern(row["relevant_parts_of_ric"])
+        self.prospects = row["prospects"]
+        self.contact = row["contact"]
+        self.related_to = row["related_to"]
+        self.display_title, self.alternative_title = _title(row)
+        self.responsible_entries = _responsible_entries(self.responsible)
+        self.versioned_dates = tuple(_dates(row))
+        self.language_entries = tuple(
+            intern(language.strip())
+            for language in self.languages.split("|")) if self.languages \
+            else ()
+        self.ric_parts: tuple[RiCPart, ...] = tuple(
+            intern(ric_part.strip())
+            for ric_part in self.relevant_parts_of_ric.split("|"))
+        # Set by _index_references, once every row has been read
+        self.referenced_by: tuple[ResourceId, ...] = ()
+
+
+def _responsible_entries(responsible: str) -> tuple[str, ...]:
+    return tuple(entry.strip() for entry in responsible.split("|"))
+
+
+def _description(resource: Resource) -> Generator[HTML, None, None]:
+    yield from _split_by_language(resource.description)
 
 
 def _title(row: Row) -> tuple[Title, AlternativeTitle | None]:
@@ -411,38 +792,37 @@ def _parse_link(link: str, css_class: str | None = None) -> str:
                 "The following is not a recognised language: "
                 f"{language}. Occurs in link: {link}")
         link = link[:-4].rstrip()
-    match = regex_match(r"\[(.+?)\]\((.+?)\)", link)
-    if match is None or not _is_link(match.group(2)):
+    match = _markdown_link_pattern.match(link)
+    if match is None or not _is_link(match["url"]):
         if not _is_link(link):
             raise NotALinkException(
                 f"The following seems not to be a link: {link}")
         link = _to_link(None, link, css_class)
     else:
-        link = _to_link(
-            match.group(1), match.group(2), css_class)
+        link = _to_link(match["text"], match["url"], css_class)
     if language is not None:
         return f"{link} ({_languages[language]})"
     return link
 
-def _links(row: Row) -> Generator[HTML, None, None]:
-    for link in row["links"].split("|"):
+def _links(links: str) -> Generator[HTML, None, None]:
+    for link in links.split("|"):
         link = link.strip()
         if not link:
             continue
         yield _parse_link(link, "link-from-resource")
 
-def _responsible_without_links(row: Row) -> Generator[HTML, None, None]:
-    for responsible in row["responsible"].split("|"):
-        responsible = responsible.strip()
+def _responsible_without_links(
+        resource: Resource) -> Generator[HTML, None, None]:
+    for responsible in resource.responsible_entries:
         if "(" in responsible:
             yield responsible.split("(", 1)[0].rstrip()
         else:
             yield responsible
 
 
-def _responsible_with_links(row: Row) -> Generator[HTML, None, None]:
-    for responsible in row["responsible"].split("|"):
-        responsible = responsible.strip()
+def _responsible_with_links(
+        responsible_entries: Iterable[str]) -> Generator[HTML, None, None]:
+    for responsible in responsible_entries:
         if "(" in responsible:
             if responsible[-1] != ")":
                 raise ValueError(
@@ -465,6 +845,10 @@ def _dates(row: Row) -> Generator[tuple[HTML, Version | None], None, None]:
         yield row["publication_date"].strip(), None
         return
     for date in dates:
+        if date.count("[") != 1:
+            raise ValueError(
+                "Expecting each date to be followed by a single version in "
+                f"square brackets, e.g. 2023 [version 1.0]: {date.strip()}")
         date, version = date.split("[")
         date = date.strip()
         version = version.strip()
@@ -479,25 +863,21 @@ def _dates(row: Row) -> Generator[tuple[HTML, Version | None], None, None]:
         yield date, version
 
 
-def _available_languages(row: Row) -> HTML | None:
-    languages = row["languages"]
-    if not languages:
+def _available_languages(resource: Resource) -> HTML | None:
+    if not resource.languages:
         return None
-    available_or_held = "Held" if row["type"] == "event" else "Available"
-    return f"{available_or_held} in: {", ".join(
-        language.strip() for language in languages.split("|"))}"
+    available_or_held = "Held" if resource.type == "event" else "Available"
+    return f"{available_or_held} in: {", ".join(resource.language_entries)}"
 
 
-def _relevant_parts_of_ric(row: Row) -> HTML | None:
-    relevant_parts = row["relevant_parts_of_ric"]
-    if not relevant_parts:
+def _relevant_parts_of_ric(resource: Resource) -> HTML | None:
+    if not resource.relevant_parts_of_ric:
         return None
-    return " ".join(f"<span class=\"ric-part\">{ric_part.strip()}</span>"
-                    for ric_part in relevant_parts.split("|"))
+    return " ".join(f"<span class=\"ric-part\">{ric_part}</span>"
+                    for ric_part in resource.ric_parts)
 
 
-def _related_to(row: Row) -> Generator[HTML, None, None]:
-    related_to = row["related_to"]
+def _related_ids(related_to: str) -> Generator[ResourceId, None, None]:
     if not related_to:
         return
     for resource in related_to.split("|"):
@@ -506,48 +886,79 @@ def _related_to(row: Row) -> Generator[HTML, None, None]:
             raise ValueError(
                 "Expecting the following 'related_to' entry to begin with #: "
                 f"{resource}")
-        resource_id = resource[1:]
+        yield resource[1:]
+
+
+def _related_resource_links(
+        resource_ids: Iterable[ResourceId],
+        css_class: str) -> Generator[HTML, None, None]:
+    for resource_id in resource_ids:
         yield (f"<a href=\"../resource-details/{resource_id}.html\" "
-               f"class=\"related-to\">#{resource_id}</a>")
+               f"class=\"{css_class}\">#{resource_id}</a>")
+
+
+def _related_to(related_to: str) -> Generator[HTML, None, None]:
+    yield from _related_resource_links(_related_ids(related_to), "related-to")
 
 
-def _remainder(row: Row) -> HTML:
+def _remainder(resource: Resource) -> HTML:
     remainder = ""
-    for link in _links(row):
+    for link in _links(resource.links):
         remainder += "\n" + " "*8 + f"<li>{link}</li>"
-    languages = _available_languages(row)
+    languages = _available_languages(resource)
     if languages is not None:
         remainder += "\n" + " "*8 + f"<li>{languages}</li>"
-    relevant_parts_of_ric = _relevant_parts_of_ric(row)
+    relevant_parts_of_ric = _relevant_parts_of_ric(resource)
     if relevant_parts_of_ric is not None:
         remainder += "\n" + " "*8 + f"<li>{relevant_parts_of_ric}</li>"
-    prospects = row["prospects"]
+    prospects = resource.prospects
     if prospects:
         prospects = "\n\n            ".join(_split_by_language(prospects))
         remainder += "\n" + " "*8 + f"<li>{prospects}</li>"
-    contact = row["contact"]
+    contact = resource.contact
     if contact:
         contacts = ", ".join(
             f"<span class=\"contact-details\">{
                 part.strip().replace('@', ' (at) ')}</span>"
             for part in contact.split("|"))
         remainder += "\n" + " "*8 + f"<li>Contact: {contacts}</li>"
-    related_to = ", ".join(_related_to(row))
+    related_to = ", ".join(_related_to(resource.related_to))
     if related_to:
         remainder += "\n" + " "*8 + f"<li>Relates to RiC resources: {
             related_to}</li>"
+    referenced_by = ", ".join(
+        _related_resource_links(resource.referenced_by, "referenced-by"))
+    if referenced_by:
+        remainder += "\n" + " "*8 + f"<li>Referred to by RiC resources: {
+            referenced_by}</li>"
     return remainder
 
 
-def _resource_details(row: Row) -> tuple[HTML, ResourceId]:
-    resource_type = _type[row["type"]]
-    title, alternative_title = _title(row)
+@_profiled
+def _resource_details(
+        resource: Resource, minify: bool = False) -> tuple[HTML, ResourceId]:
+    page = _resource_details_page()
+    parts = _resource_details_parts(resource)
+    if minify:
+        page = page.minified()
+        parts = {name: _minified(part) for name, part in parts.items()}
+    return page.render(**parts), resource.id
+
+
+@_profiled
+def _resource_details_parts(resource: Resource) -> dict[str, HTML]:
+    """
+    The parts of the page with the details of a resource which vary from
+    resource to resource
+    """
+    resource_type = _type[resource.type]
+    alternative_title = resource.alternative_title
     if alternative_title is not None:
         alternative_title = "\n" + " "*8 + f"({alternative_title})"
     else:
         alternative_title = ""
-    description = "\n\n            ".join(_description(row))
-    versioned_dates = list(_dates(row))
+    description = "\n\n            ".join(_description(resource))
+    versioned_dates = resource.versioned_dates
     if len(versioned_dates) == 1:
         date, version = versioned_dates[0]
         dates = f"{date} (v{version})" if version is not None else date
@@ -558,13 +969,9 @@ def _resource_details(row: Row) -> tuple[HTML, ResourceId]:
                 dates += f"<li class=\"version\">{date} (v{version})</li>"
             else:
                 dates += f"<li class=\"version\">{date}</li>"
-    "".join(
-        f"<span class='resource-details-date'>{date} (v{version})</span>"
-        if version is not None else f"<span class='resource-details-date'>{
-            date}</span>"
-        for date, version in _dates(row))
-    if row["type"] != "article":
-        responsibles = list(_responsible_with_links(row))
+    if resource.type != "article":
+        responsibles = list(
+            _responsible_with_links(resource.responsible_entries))
         if len(responsibles) == 1:
             responsible = responsibles[0]
         else:
@@ -574,85 +981,439 @@ def _resource_details(row: Row) -> tuple[HTML, ResourceId]:
                 for part in responsibles)
             responsible += "</ul>"
     else:
-        responsible = ", ".join(_responsible_with_links(row))
-    resource_id = row["id"]
-    resource_details_html = _resource_details_html_template.substitute(
-        resource_id=resource_id,
-        resource_icon=f"../{ICONS_DIRECTORY_NAME}/{
-            _resource_icons[row["type"]]}",
-        resource_icon_alt=resource_type,
-        title=title,
-        alternative_title=alternative_title,
-        responsible=responsible,
-        date=dates,
-        description=description,
-        remainder=_remainder(row)
-    )
-    return _site_template.substitute(
+        responsible = ", ".join(
+            _responsible_with_links(resource.responsible_entries))
+    return {
+        "resource_id": resource.id,
+        "resource_icon": f"../{ICONS_DIRECTORY_NAME}/{
+            _resource_icons[resource.type]}",
+        "resource_icon_alt": resource_type,
+        "title": resource.display_title,
+        "alternative_title": alternative_title,
+        "responsible": responsible,
+        "date": dates,
+        "description": description,
+        "remainder": _remainder(resource)
+    }
+
+
+@cache
+def _resource_details_page() -> _PrebuiltHTML:
+    return _PrebuiltHTML(_site_template.substitute(
         css_path=f"../{CSS_FILE_NAME}",
         logo_path=f"../{LOGO_FILE_NAME}",
-        icons_path=f"../{ICONS_DIRECTORY_NAME}",
         resource_list_path="../index.html",
         javascript="",
         introduction=_RESOURCE_DETAILS_INTRODUCTION_HTML,
         add_or_edit_menu=_add_or_edit_menu_html_template.substitute(
             components=_add_or_edit_menu_components["edit"].substitute(
                 edit_resource_path=f"../{EDITS_DIRECTORY_NAME}",
-                resource_id=resource_id,
+                resource_id=_placeholder("resource_id"),
                 icons_path=f"../{ICONS_DIRECTORY_NAME}")),
         filter_menu="",
-        content=resource_details_html), resource_id
+        content=_resource_details_html_template.substitute(_placeholders(
+            "resource_icon", "resource_icon_alt", "title", "alternative_title",
+            "responsible", "date", "description", "remainder"))))
 
 
-def _resource(row, icons_path: str, resource_details_path: str) -> tuple[
-        HTML, Date, ResourceType]:
-    title, _ = _title(row)
-    if row["type"] != "article":
-        responsible = " and ".join(_responsible_without_links(row))
+@cache
+def _resource_entry(
+        icons_path: str, resource_details_path: str) -> _PrebuiltHTML:
+    return _PrebuiltHTML(_resource_entry_template.substitute(
+        icons_path=icons_path,
+        resource_details_path=resource_details_path,
+        **_placeholders(
+            "resource_id", "resource_icon", "resource_icon_alt", "title",
+            "responsible", "date")))
+
+
+@_profiled
+def _resource(
+        resource: Resource,
+        icons_path: str,
+        resource_details_path: str,
+        minify: bool = False) -> HTML:
+    if resource.type != "article":
+        responsible = " and ".join(_responsible_without_links(resource))
     else:
-        responsible = ", ".join(_responsible_without_links(row))
-    versioned_dates = list(_dates(row))
+        responsible = ", ".join(_responsible_without_links(resource))
+    versioned_dates = resource.versioned_dates
     dates = ", ".join(f"{date} (v{version})" if version is not None else date
                       for date, version in versioned_dates)
-    earliest_date, _ = versioned_dates[0]
-    return _resource_entry_template.substitute(
-        resource_id=row["id"],
-        icons_path=icons_path,
-        resource_details_path=resource_details_path,
-        resource_icon=_resource_icons[row["type"]],
-        resource_icon_alt=_type[row["type"]],
-        title=title,
+    entry = _resource_entry(icons_path, resource_details_path)
+    if minify:
+        entry = entry.minified()
+    return entry.render(
+        resource_id=resource.id,
+        resource_icon=_resource_icons[resource.type],
+        resource_icon_alt=_type[resource.type],
+        title=resource.display_title,
         responsible=responsible,
-        date=dates,
-    ), earliest_date, row["type"]
+        date=dates)
 
 
-def _process_master_document(
-        path_to_csv: Path,
-        row_processor: Callable[[Any], T]) -> Generator[T, None, None]:
+def _newest_first(resources: list[Resource]) -> list[Resource]:
+    return sorted(
+        resources,
+        key=lambda resource: resource.versioned_dates[0][0],
+        reverse=True)
+
+
+@_profiled
+def _read_master_document(path_to_csv: Path) -> list[Resource]:
     with open(path_to_csv, "r", encoding="utf-8") as csv_file:
-        csv_reader = DictReader(csv_file)
-        for row in csv_reader:
-            yield row_processor(row)
+        resources = [
+            Resource(row)
+            for row in with_journal(DictReader(csv_file), path_to_csv)]
+    _index_references(resources)
+    return resources
 
 
-def resource_list(path_to_csv: Path) -> HTML:
+def _index_references(resources: list[Resource]) -> None:
+    """
+    Sets the resources which refer to each resource in their related_to
+    column, in time linear in the number of resources and references, by way
+    of an index of the resources by id. Raises a ValueError if two resources
+    have the same id, or if a resource refers to one which does not exist.
+    """
+    referenced_by: dict[ResourceId, list[ResourceId]] = {}
+    for resource in resources:
+        if resource.id in referenced_by:
+            raise ValueError(
+                f"The following id is shared by several resources: "
+                f"{resource.id}")
+        referenced_by[resource.id] = []
+    for resource in resources:
+        for related_id in dict.fromkeys(_related_ids(resource.related_to)):
+            try:
+                referenced_by[related_id].append(resource.id)
+            except KeyError:
+                raise ValueError(
+                    f"Resource {resource.id} is related to resource "
+                    f"{related_id}, which does not exist") from None
+    for resource in resources:
+        resource.referenced_by = tuple(referenced_by[resource.id])
+
+
+@_profiled
+def _write_if_changed(path: Path, content: str) -> bool:
+    """
+    Writes the content to the file at the given path, unless the file already
+    has exactly this content, in which case it is left untouched. Returns
+    whether the file was written.
+    """
+    encoded_content = content.encode("utf-8")
+    try:
+        if path.read_bytes() == encoded_content:
+            _metrics.record_write(False)
+            return False
+    except FileNotFoundError:
+        pass
+    path.write_bytes(encoded_content)
+    _metrics.record_write(True, len(encoded_content))
+    return True
+
+
+@_profiled
+def _stream_if_changed(path: Path, chunks: Iterable[str]) -> bool:
+    """
+    As _write_if_changed, but writes the content chunk by chunk, so that it is
+    never held in memory as a whole. The chunks are written to a temporary
+    file, which replaces the file at the given path only if the two differ.
+    """
+    temporary_path = path.with_name(f"{path.name}.tmp")
+    with open(
+            temporary_path,
+            "w",
+            encoding="utf-8",
+            newline="") as temporary_file:
+        for chunk in chunks:
+            temporary_file.write(chunk)
+    if path.exists() and compare_files(temporary_path, path, shallow=False):
+        temporary_path.unlink()
+        _metrics.record_write(False)
+        return False
+    _metrics.record_write(True, temporary_path.stat().st_size)
+    temporary_path.replace(path)
+    return True
+
+
+def _process_all(
+        items: list[S],
+        processor: Callable[[S], T],
+        jobs: int = 1) -> Generator[T, None, None]:
+    """
+    If jobs is greater than 1, the items (e.g. resources) are processed in a
+    pool of that many processes, in which case processor must be picklable
+    (e.g. a top-level function or a partial of one). The results are yielded
+    in the order of the items in either case.
+    """
+    if jobs == 1:
+        for item in items:
+            yield processor(item)
+        return
+    chunksize = max(1, len(items) // (4 * jobs))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        if not _metrics.enabled:
+            yield from executor.map(processor, items, chunksize=chunksize)
+            return
+        for result, snapshot in executor.map(
+                partial(_profiled_call, processor), items,
+                chunksize=chunksize):
+            _metrics.merge(snapshot)
+            yield result
+
+
+@dataclass(frozen=True)
+class RowError:
+    """
+    An error in a column of the master document, found by validate. The line
+    is that of the CSV file on which the row starts, or, for a resource added
+    by the journal, that following the last row. The journal entry, if any,
+    is that which set the column in error, or which cannot be applied
+    """
+    line: int
+    resource_id: ResourceId
+    column: str
+    message: str
+    journal_entry: Path | None = None
+
+
+def _check_type(row: Row) -> None:
+    if row["type"] not in _type:
+        raise ValueError(
+            f"The following is not a recognised type: {row["type"]}")
+
+
+# For each column whose parsing can fail, parses the column of a row as when
+# generating the pages, raising the same errors
+_column_parsers: dict[str, Callable[[Row], object]] = {
+    "title": _title,
+    "responsible": lambda row: list(_responsible_with_links(
+        _responsible_entries(row["responsible"]))),
+    "description": lambda row: list(_split_by_language(row["description"])),
+    "publication_date": lambda row: list(_dates(row)),
+    "type": _check_type,
+    "links": lambda row: list(_links(row["links"])),
+    "prospects": lambda row: list(_split_by_language(row["prospects"]))
+    if row["prospects"] else None,
+    "related_to": lambda row: list(_related_to(row["related_to"]))
+}
+
+
+# The format expected of each column which _column_parsers parses, for the
+# errors which the parsers raise without a message of their own
+_column_formats = {
+    "title": "a title, or a title in each of two languages, each ending in "
+             "a language tag such as [en], separated by |",
+    "responsible": "people or organisations separated by |, each "
+                   "optionally followed by a link in parentheses",
+    "description": "a text, or a text in each of several languages, each "
+                   "ending in a language tag such as [en], separated by |",
+    "publication_date": "a date, or dates each followed by a version such as "
+                        "[version 1.0], separated by |",
+    "type": f"one of: {", ".join(_type)}",
+    "links": "links separated by |, each optionally ending in a language "
+             "tag such as [en]",
+    "prospects": "a text, or a text in each of several languages, each "
+                 "ending in a language tag such as [en], separated by |",
+    "related_to": "ids of resources separated by |, each beginning with #"
+}
+
+
+def _column_count_error(
+        line: int, row: Row, columns: list[str]) -> RowError | None:
+    """
+    The error in a row with fewer or more values than the header has columns,
+    for which DictReader gives None for each missing column, and the extra
+    values under the None key. Such a row is not checked further
+    """
+    missing_columns = [
+        column for column, value in row.items()
+        if column is not None and value is None]
+    extra_values = row.get(None, [])
+    if not missing_columns and not extra_values:
+        return None
+    found = len(columns) - len(missing_columns) + len(extra_values)
+    if missing_columns:
+        return RowError(
+            line, row["id"] or "", missing_columns[0],
+            f"The row has {found} columns rather than {len(columns)}, so "
+            f"lacks: {", ".join(missing_columns)}")
+    return RowError(
+        line, row["id"], columns[-1],
+        f"The row has {found} columns rather than {len(columns)}, with "
+        f"{len(extra_values)} after this, the last one: a value containing a "
+        f"comma may lack its surrounding double quotes")
+
+
+def _row_errors(numbered_row: tuple[int, Row]) -> list[RowError]:
+    line, row = numbered_row
+    errors = []
+    for column, parser in _column_parsers.items():
+        try:
+            parser(row)
+        except IndexError:
+            # Raised by the parsers on an empty or truncated entry, e.g.
+            # between two |, or a language tag without its [
+            errors.append(RowError(
+                line, row["id"], column,
+                f"Unexpected empty or incomplete entry in: {row[column]}. "
+                f"Expecting {_column_formats[column]}"))
+        except ValueError as error:
+            errors.append(RowError(line, row["id"], column, str(error)))
+    return errors
+
+
+def _reference_errors(numbered_rows: list[tuple[int, Row]]) -> list[RowError]:
+    """
+    The errors which _index_references would raise: ids shared by several
+    rows, and related_to entries referring to an id which no row has. Entries
+    which cannot be parsed are left to _row_errors. Also ids which are not in
+    increasing order, on which update_master_document.py relies to find the
+    largest id from the last row alone
+    """
+    errors = []
+    ids: set[ResourceId] = set()
+    largest_id = -1
+    for line, row in numbered_rows:
+        if row["id"] is None:
+            # Reported by _column_count_error
+            continue
+        if row["id"] in ids:
+            errors.append(RowError(
+                line, row["id"], "id", "The id is shared by an earlier row"))
+        elif not row["id"].isdigit():
+            errors.append(RowError(
+                line, row["id"], "id",
+                "Expecting the id to be a whole number"))
+        elif int(row["id"]) < largest_id:
+            errors.append(RowError(
+                line, row["id"], "id",
+                f"Expecting the id to be greater than those of the earlier "
+                f"rows, the largest of which is {largest_id}"))
+        if row["id"].isdigit():
+            largest_id = max(largest_id, int(row["id"]))
+        ids.add(row["id"])
+    for line, row in numbered_rows:
+        try:
+            related_ids = list(_related_ids(row["related_to"] or ""))
+        except (IndexError, ValueError):
+            continue
+        errors.extend(
+            RowError(line, row["id"], "related_to",
+                     f"No resource has the id: {related_id}")
+            for related_id in related_ids if related_id not in ids)
+    return errors
+
+
+def validate(path_to_csv: Path, jobs: int = 1) -> list[RowError]:
+    """
+    Parses every row of the master document, with its journal applied, as
+    when generating the pages, without generating any, and returns all the
+    errors found rather than stopping at the first, including references to
+    resources which do not exist, and journal entries which cannot be
+    applied. An error in a column set by a journal entry names the entry. The
+    rows are parsed in the given number of processes
+    """
+    with open(path_to_csv, "r", encoding="utf-8") as csv_file:
+        reader = DictReader(csv_file)
+        missing_columns = [
+            column for column in _COLUMNS
+            if column not in (reader.fieldnames or [])]
+        if missing_columns:
+            return [RowError(1, "", column, "Missing column")
+                    for column in missing_columns]
+        numbered_rows = []
+        well_formed_rows = []
+        errors = []
+        rejected_entries: list[tuple[Path, str]] = []
+        column_sources: dict[ResourceId, dict[str, Path]] = {}
+        line = reader.line_num + 1
+        for row in with_journal(
+                reader,
+                path_to_csv,
+                lambda entry, reason: rejected_entries.append(
+                    (entry, reason)),
+                column_sources):
+            numbered_rows.append((line, row))
+            column_count_error = _column_count_error(
+                line, row, list(reader.fieldnames))
+            if column_count_error is None:
+                well_formed_rows.append((line, row))
+            else:
+                errors.append(column_count_error)
+            line = reader.line_num + 1
+    for row_errors in _process_all(well_formed_rows, _row_errors, jobs):
+        errors.extend(row_errors)
+    errors.extend(_reference_errors(numbered_rows))
+    errors = [
+        with_fields(
+            error,
+            journal_entry=column_sources.get(error.resource_id, {}).get(
+                error.column))
+        for error in errors]
+    errors.extend(
+        RowError(line, "", "", f"Cannot be applied: {reason}", entry)
+        for entry, reason in rejected_entries)
+    errors.sort(key=lambda error: error.line)
+    return errors
+
+
+def resource_list(path_to_csv: Path, minify: bool = False) -> HTML:
     """
     Generates the HTML for the resource list (landing page of the website)
     """
-    list_entries_with_date = list(_process_master_document(
-        path_to_csv,
-        lambda row: _resource(
-            row,
-            ICONS_DIRECTORY_NAME,
-            RESOURCE_DETAILS_DIRECTORY_NAME)))
-    list_entries_with_date.sort(key=lambda entry: entry[1], reverse=True)
-    list_entries = "".join(
-        [resource for resource, _, _ in list_entries_with_date])
-    return _site_template.substitute(
+    return "".join(_resource_list(
+        _read_master_document(path_to_csv),
+        _last_modified(path_to_csv),
+        minify))
+
+
+def _resource_list(
+        resources: list[Resource],
+        last_updated: str,
+        minify: bool = False) -> Generator[HTML, None, None]:
+    """
+    Yields the HTML of the resource list piece by piece, rendering each entry
+    only when it is reached, so that the page never needs to be held in memory
+    as a whole
+    """
+    page = _resource_list_page()
+    if minify:
+        page = page.minified()
+    return page.stream(
+        list_entries=(
+            _resource(
+                resource,
+                ICONS_DIRECTORY_NAME,
+                RESOURCE_DETAILS_DIRECTORY_NAME,
+                minify)
+            for resource in _newest_first(resources)),
+        navigation="",
+        last_updated=last_updated)
+
+
+def _filter_menu_html(path_to_filterings: str, icons_path: str) -> HTML:
+    return _filter_menu_html_template.substitute(
+        components="\n".join(
+            template.substitute(
+                applications_path=f"{path_to_filterings}/applications.html",
+                articles_path=f"{path_to_filterings}/articles.html",
+                datasets_path=f"{path_to_filterings}/datasets.html",
+                events_path=f"{path_to_filterings}/events.html",
+                theses_path=f"{path_to_filterings}/theses.html",
+                tools_path=f"{path_to_filterings}/tools.html",
+                icons_path=icons_path,
+                css_class="icon")
+            for template in _filter_menu_components.values()))
+
+
+@cache
+def _resource_list_page() -> _PrebuiltHTML:
+    return _PrebuiltHTML(_site_template.substitute(
         css_path=CSS_FILE_NAME,
         logo_path=LOGO_FILE_NAME,
-        icons_path=ICONS_DIRECTORY_NAME,
         resource_list_path="",
         javascript="",
         introduction=_RESOURCE_LIST_INTRODUCTION_HTML,
@@ -660,37 +1421,39 @@ def resource_list(path_to_csv: Path) -> HTML:
             components=_add_or_edit_menu_components["add"].substitute(
                 add_resource_path=".",
                 icons_path=ICONS_DIRECTORY_NAME)),
-        filter_menu=_filter_menu_html_template.substitute(
-            components="\n".join(
-                template.substitute(
-                    applications_path="filterings/applications.html",
-                    articles_path="filterings/articles.html",
-                    datasets_path="filterings/datasets.html",
-                    events_path="filterings/events.html",
-                    theses_path="filterings/theses.html",
-                    tools_path="filterings/tools.html",
-                    icons_path=ICONS_DIRECTORY_NAME,
-                    css_class="icon")
-                for template in _filter_menu_components.values())),
+        filter_menu=_filter_menu_html(
+            FILTERINGS_DIRECTORY_NAME, ICONS_DIRECTORY_NAME),
         content=_resource_list_html_template.substitute(
-            list_entries=list_entries,
-            last_updated=_current_timestamp())
-    )
+            _placeholders("list_entries", "navigation", "last_updated"))))
 
 
-def resource_details(path_to_csv: Path, path_to_resource_details: Path) -> None:
+def resource_details(
+        path_to_csv: Path,
+        path_to_resource_details: Path,
+        jobs: int = 1,
+        minify: bool = False) -> None:
     """
     Generates HTML files with the details of each resource, one for each
     resource, saving them into a directory specified in an environment
-    variable
+    variable. The pages are rendered in the given number of processes.
     """
-    for resource_details_html, resource_id in _process_master_document(
-            path_to_csv, _resource_details):
-        with open(
-                path_to_resource_details / f"{resource_id}.html",
-                "w",
-                encoding="utf-8") as resource_details_file:
-            resource_details_file.write(resource_details_html)
+    _write_resource_details(
+        _read_master_document(path_to_csv),
+        path_to_resource_details,
+        jobs,
+        minify)
+
+
+def _write_resource_details(
+        resources: list[Resource],
+        path_to_resource_details: Path,
+        jobs: int = 1,
+        minify: bool = False) -> None:
+    for resource_details_html, resource_id in _process_all(
+            resources, partial(_resource_details, minify=minify), jobs):
+        _write_if_changed(
+            path_to_resource_details / f"{resource_id}.html",
+            resource_details_html)
 
 
 def add_resource(backend_url: URL) -> HTML:
@@ -746,77 +1509,427 @@ def _filtering_path(
     return "../index.html"
 
 
-def filterings(path_to_csv: Path, path_to_filterings: Path) -> None:
+class Facet:  # pylint: disable=too-few-public-methods
+    """
+    A property of resources by which the resource list can be browsed: for
+    each resource, the values of the property which it has
+    """
+
+    __slots__ = ("label", "description", "values")
+
+    def __init__(
+            self,
+            label: str,
+            description: str,
+            values: Callable[[Resource], Iterable[str]]) -> None:
+        self.label = label
+        # Describes the resources with a value, which is substituted for $value
+        self.description = Template(description)
+        self.values = values
+
+
+def _year(resource: Resource) -> str | None:
+    """
+    The year of the earliest date of the resource, or None if the date does
+    not start with a year
+    """
+    year = min(date for date, _ in resource.versioned_dates)[:4]
+    return year if len(year) == 4 and year.isdigit() else None
+
+
+def _language_values(resource: Resource) -> Generator[str, None, None]:
+    for language in resource.language_entries:
+        # E.g. 'English (title and abstract)'
+        language = language.split("(", 1)[0].strip()
+        if language:
+            yield language
+
+
+_facets = {
+    "type": Facet(
+        "Types", "of type $value", lambda resource: (resource.type,)),
+    "year": Facet(
+        "Years",
+        "which were first published, held, or released in $value",
+        lambda resource: () if _year(resource) is None
+        else (_year(resource),)),
+    "language": Facet(
+        "Languages", "which are available in $value", _language_values),
+    "ric-part": Facet(
+        "Parts of RiC",
+        "which concern $value",
+        lambda resource: (
+            ric_part for ric_part in resource.ric_parts if ric_part)),
+    "responsible": Facet(
+        "Responsible",
+        "for which $value is responsible",
+        lambda resource: (
+            responsible
+            for responsible in _responsible_without_links(resource)
+            if responsible))
+}
+
+# The facets which have pages in the facets directory. Types and years have
+# their own directories.
+_BROWSABLE_FACETS = ["language", "ric-part", "responsible"]
+
+FacetIndex = dict[str, list[Resource]]
+
+
+def _facet_indexes(
+        resources: list[Resource],
+        facets: Iterable[str]) -> dict[str, FacetIndex]:
+    """
+    Builds an inverted index for each of the given facets in a single pass
+    over the resources, mapping each value of the facet to the resources which
+    have it, in the order of the given resources
+    """
+    facets = [(name, _facets[name].values) for name in facets]
+    indexes: dict[str, defaultdict[str, list[Resource]]] = {
+        name: defaultdict(list) for name, _ in facets}
+    for resource in resources:
+        for name, values in facets:
+            index = indexes[name]
+            # A value may occur more than once for a resource
+            for value in dict.fromkeys(values(resource)):
+                index[value].append(resource)
+    return {name: dict(index) for name, index in indexes.items()}
+
+
+def _folded(text: str) -> str:
+    """
+    The text case-folded and with accents stripped, e.g. 'Société' becomes
+    'societe'
+    """
+    return "".join(
+        character for character in normalize("NFKD", text.casefold())
+        if not combining(character))
+
+
+def _slug(value: str) -> str:
+    return _non_slug_characters_pattern.sub("-", _folded(value)).strip("-")
+
+
+_non_slug_characters_pattern = regex_compile(r"[^a-z0-9]+")
+
+
+def _facet_page_names(facet: str, values: Iterable[str]) -> dict[str, str]:
+    """
+    Maps each value of the facet to the name of its page, which is made unique
+    should two values have the same slug
+    """
+    names: dict[str, str] = {}
+    taken: set[str] = set()
+    for value in sorted(values):
+        name = f"{facet}-{_slug(value) or "other"}"
+        number = 1
+        while (unique_name := name if number == 1 else f"{name}-{number}") \
+                in taken:
+            number += 1
+        taken.add(unique_name)
+        names[value] = unique_name
+    return names
+
+
+def filterings(
+        path_to_csv: Path,
+        path_to_filterings: Path,
+        page_size: int | None = None,
+        minify: bool = False) -> None:
     """
     Generates HTML files for filterings of the resource list, one for each
     filtering, saving them into a directory specified in an environment
-    variable
+    variable. If a page size is given, each filtering is split into pages of
+    at most that many resources.
     """
-    list_entries_with_date = list(_process_master_document(
-        path_to_csv,
-        lambda row: _resource(
-            row,
-            f"../{ICONS_DIRECTORY_NAME}",
-            f"../{RESOURCE_DETAILS_DIRECTORY_NAME}")))
-    list_entries_with_date.sort(key=lambda entry: entry[1], reverse=True)
+    resources = _read_master_document(path_to_csv)
+    last_updated = _last_modified(path_to_csv)
+    for listing in _listings(resources):
+        if listing.directory == FILTERINGS_DIRECTORY_NAME:
+            _write_listing(
+                listing,
+                path_to_filterings,
+                last_updated,
+                page_size,
+                [],
+                minify=minify)
+
+
+@dataclass(frozen=True)
+class _Listing:
+    """
+    A list of resources shown newest first, possibly over several pages: the
+    resource list itself, or the resources with a given value of a facet, i.e.
+    a filtering by type, a year archive, or a facet page
+    """
+    directory: str
+    name: str
+    page: _PrebuiltHTML
+    resources: list[Resource]
+    facet: str = ""
+    value: str = ""
+    # The single page sub-commands print the resource list to stdout
+    suffix: str = ""
+
+
+def _listings(
+        resources: list[Resource],
+        year_archives: bool = False,
+        facets: bool = False) -> list[_Listing]:
+    """
+    The listings of the website. The resources of every filtering, year
+    archive, and facet page are drawn from inverted indexes built in a single
+    pass over the resources.
+    """
+    newest_first = _newest_first(resources)
+    indexes = _facet_indexes(
+        newest_first,
+        ["type"]
+        + (["year"] if year_archives else [])
+        + (_BROWSABLE_FACETS if facets else []))
+    listings = [_Listing(
+        "", "index", _resource_list_page(), newest_first, suffix="\n")]
     for filter_type, plural in _resource_type_filters.items():
-        list_entries = "".join(
-            [resource for resource, _, resource_type in list_entries_with_date
-             if resource_type == filter_type])
-        plural += ".html"
-        with open(
-                path_to_filterings / plural,
-                "w",
-                encoding="utf-8") as filtering_file:
-            filtering_file.write(
-                _site_template.substitute(
-                    css_path=f"../{CSS_FILE_NAME}",
-                    logo_path=f"../{LOGO_FILE_NAME}",
+        listings.append(_Listing(
+            FILTERINGS_DIRECTORY_NAME,
+            plural,
+            _filtering_page(filter_type),
+            indexes["type"].get(filter_type, []),
+            "type",
+            filter_type))
+    for year, year_resources in sorted(
+            indexes.get("year", {}).items(), reverse=True):
+        listings.append(_Listing(
+            YEARS_DIRECTORY_NAME,
+            year,
+            _facet_page("year", year),
+            year_resources,
+            "year",
+            year))
+    for facet in _BROWSABLE_FACETS if facets else []:
+        index = indexes[facet]
+        for value, name in _facet_page_names(facet, index).items():
+            listings.append(_Listing(
+                FACETS_DIRECTORY_NAME,
+                name,
+                _facet_page(facet, value),
+                index[value],
+                facet,
+                value))
+    return listings
+
+
+def _paginated(
+        resources: list[Resource],
+        page_size: int | None) -> list[list[Resource]]:
+    if page_size is None or not resources:
+        return [resources]
+    return [resources[start:start + page_size]
+            for start in range(0, len(resources), page_size)]
+
+
+def _page_file_name(name: str, page_number: int) -> str:
+    # The first page keeps the name of an unpaginated listing, so that links
+    # to it need not change
+    if page_number == 1:
+        return f"{name}.html"
+    return f"{name}_{page_number}.html"
+
+
+def _listing_file_names(
+        listing: _Listing, page_size: int | None) -> list[str]:
+    return [
+        _page_file_name(listing.name, page_number)
+        for page_number in range(
+            1, len(_paginated(listing.resources, page_size)) + 1)]
+
+
+def _pagination_html(
+        name: str, page_number: int, number_of_pages: int) -> HTML:
+    if number_of_pages == 1:
+        return ""
+    links = []
+    if page_number > 1:
+        links.append(
+            f"<a href=\"{_page_file_name(name, page_number - 1)}\" "
+            "rel=\"prev\">Newer</a>")
+    links.append(
+        f"<span class=\"page-number\">Page {page_number} of "
+        f"{number_of_pages}</span>")
+    if page_number < number_of_pages:
+        links.append(
+            f"<a href=\"{_page_file_name(name, page_number + 1)}\" "
+            "rel=\"next\">Older</a>")
+    return f"\n      <p class=\"pagination\">{" ".join(links)}</p>"
+
+
+def _year_archives_html(years: list[str], path_to_years: str) -> HTML:
+    if not years:
+        return ""
+    links = " ".join(
+        f"<a href=\"{path_to_years}/{year}.html\">{year}</a>"
+        for year in years)
+    return f"\n      <p class=\"year-archives\">By year: {links}</p>"
+
+
+def _facets_link_html(path_to_facets: str) -> HTML:
+    return (f"\n      <p class=\"facets-link\"><a href=\"{path_to_facets}/"
+            "index.html\">Browse by language, part of RiC, or responsible"
+            "</a></p>")
+
+
+def _relative_path(directory: str, path: str) -> str:
+    """
+    Path of a top level file or directory of the website relative to the
+    given directory of the website, which is either the root or a directory
+    directly beneath it
+    """
+    if not directory:
+        return path
+    if directory == path:
+        return "."
+    return f"../{path}"
+
+
+def _write_listing(
+        listing: _Listing,
+        path_to_directory: Path,
+        last_updated: str,
+        page_size: int | None,
+        years: list[str],
+        facets: bool = False,
+        minify: bool = False) -> None:
+    icons_path = _relative_path(listing.directory, ICONS_DIRECTORY_NAME)
+    resource_details_path = _relative_path(
+        listing.directory, RESOURCE_DETAILS_DIRECTORY_NAME)
+    navigation = _year_archives_html(
+        years, _relative_path(listing.directory, YEARS_DIRECTORY_NAME))
+    if facets:
+        navigation += _facets_link_html(
+            _relative_path(listing.directory, FACETS_DIRECTORY_NAME))
+    page = listing.page.minified() if minify else listing.page
+    pages = _paginated(listing.resources, page_size)
+    for page_number, resources in enumerate(pages, start=1):
+        page_navigation = _pagination_html(
+            listing.name, page_number, len(pages)) + navigation
+        _stream_if_changed(
+            path_to_directory / _page_file_name(listing.name, page_number),
+            chain(
+                page.stream(
+                    list_entries=(
+                        _resource(
+                            resource,
+                            icons_path,
+                            resource_details_path,
+                            minify)
+                        for resource in resources),
+                    navigation=_minified(page_navigation) if minify
+                    else page_navigation,
+                    last_updated=last_updated),
+                [listing.suffix]))
+    # Pages beyond the last, left by a build with a smaller page size or with
+    # more resources in the listing
+    for page_number in count(len(pages) + 1):
+        path = path_to_directory / _page_file_name(listing.name, page_number)
+        if not path.exists():
+            break
+        path.unlink()
+        for compressed_path in _compressed_paths(path):
+            compressed_path.unlink(missing_ok=True)
+
+
+@cache
+def _filtering_page(filter_type: ResourceType) -> _PrebuiltHTML:
+    return _PrebuiltHTML(_site_template.substitute(
+        css_path=f"../{CSS_FILE_NAME}",
+        logo_path=f"../{LOGO_FILE_NAME}",
+        resource_list_path="../index.html",
+        javascript="",
+        introduction=_RESOURCE_LIST_INTRODUCTION_HTML,
+        add_or_edit_menu=_add_or_edit_menu_html_template.substitute(
+            components=_add_or_edit_menu_components["add"].substitute(
+                add_resource_path="..",
+                icons_path=f"../{ICONS_DIRECTORY_NAME}")),
+        filter_menu=_filter_menu_html_template.substitute(
+            components="\n".join(
+                template.substitute(
+                    applications_path=_filtering_path(
+                        filter_type, "web application"),
+                    articles_path=_filtering_path(
+                        filter_type, "article"),
+                    datasets_path=_filtering_path(
+                        filter_type, "dataset"),
+                    events_path=_filtering_path(
+                        filter_type, "event"),
+                    theses_path=_filtering_path(
+                        filter_type, "thesis"),
+                    tools_path=_filtering_path(
+                        filter_type, "tool"),
                     icons_path=f"../{ICONS_DIRECTORY_NAME}",
-                    resource_list_path="../index.html",
-                    javascript="",
-                    introduction=_RESOURCE_LIST_INTRODUCTION_HTML,
-                    add_or_edit_menu=_add_or_edit_menu_html_template.substitute(
-                        components=_add_or_edit_menu_components[
-                            "add"].substitute(
-                                add_resource_path="..",
-                                icons_path=f"../{ICONS_DIRECTORY_NAME}")),
-                    filter_menu=_filter_menu_html_template.substitute(
-                        components="\n".join(
-                            template.substitute(
-                                applications_path=_filtering_path(
-                                    filter_type, "web application"),
-                                articles_path=_filtering_path(
-                                    filter_type, "article"),
-                                datasets_path=_filtering_path(
-                                    filter_type, "dataset"),
-                                events_path=_filtering_path(
-                                    filter_type, "event"),
-                                theses_path=_filtering_path(
-                                    filter_type, "thesis"),
-                                tools_path=_filtering_path(
-                                    filter_type, "tool"),
-                                icons_path=f"../{ICONS_DIRECTORY_NAME}",
-                                css_class=_css_class(
-                                    filter_type, resource_type))
-                            for resource_type, template in
-                            _filter_menu_components.items())),
-                    content=_resource_list_html_template.substitute(
-                        list_entries=list_entries,
-                        last_updated=_current_timestamp())
-                )
-            )
-
-
-def _checked_type(row, resource_type: ResourceType) -> str:
-    if row["type"].strip() == resource_type:
+                    css_class=_css_class(
+                        filter_type, resource_type))
+                for resource_type, template in
+                _filter_menu_components.items())),
+        content=_resource_list_html_template.substitute(
+            _placeholders("list_entries", "navigation", "last_updated"))))
+
+
+@cache
+def _facet_page(facet: str, value: str) -> _PrebuiltHTML:
+    return _PrebuiltHTML(_site_template.substitute(
+        css_path=f"../{CSS_FILE_NAME}",
+        logo_path=f"../{LOGO_FILE_NAME}",
+        resource_list_path="../index.html",
+        javascript="",
+        introduction=_facet_introduction_html_template.substitute(
+            description=_facets[facet].description.substitute(value=value)),
+        add_or_edit_menu=_add_or_edit_menu_html_template.substitute(
+            components=_add_or_edit_menu_components["add"].substitute(
+                add_resource_path="..",
+                icons_path=f"../{ICONS_DIRECTORY_NAME}")),
+        filter_menu=_filter_menu_html(
+            f"../{FILTERINGS_DIRECTORY_NAME}", f"../{ICONS_DIRECTORY_NAME}"),
+        content=_resource_list_html_template.substitute(
+            _placeholders("list_entries", "navigation", "last_updated"))))
+
+
+def _facets_overview(listings: list[_Listing]) -> HTML:
+    """
+    Generates the HTML of the page linking to every facet page and year
+    archive amongst the given listings
+    """
+    facet_listings: dict[str, list[_Listing]] = defaultdict(list)
+    for listing in listings:
+        facet_listings[listing.facet].append(listing)
+    return _site_template.substitute(
+        css_path=f"../{CSS_FILE_NAME}",
+        logo_path=f"../{LOGO_FILE_NAME}",
+        resource_list_path="../index.html",
+        javascript="",
+        introduction=_FACETS_INTRODUCTION_HTML,
+        add_or_edit_menu="",
+        filter_menu="",
+        content=_facets_html_template.substitute(facets="".join(
+            _facet_html_template.substitute(
+                label=_facets[facet].label,
+                values=" ".join(
+                    f"<a href=\"{_relative_path(
+                        FACETS_DIRECTORY_NAME, listing.directory)}/"
+                    f"{listing.name}.html\">{listing.value}</a> "
+                    f"({len(listing.resources)})"
+                    for listing in facet_listings[facet]))
+            for facet in ["year", *_BROWSABLE_FACETS]
+            if facet_listings[facet])))
+
+
+def _checked_type(resource: Resource, resource_type: ResourceType) -> str:
+    if resource.type.strip() == resource_type:
         return "checked"
     return ""
 
 
-def _ric_parts_to_check(row: Row) -> Generator[RiCPart, None, None]:
-    for part in row["relevant_parts_of_ric"].split("|"):
-        part = part.strip()
+def _ric_parts_to_check(resource: Resource) -> Generator[RiCPart, None, None]:
+    for part in resource.ric_parts:
         found = False
         for ric_part in [
                 "RiC-CM 1.0", "RiC-CM 0.2", "RiC-O 1.0", "RiC-O 0.2"]:
@@ -834,67 +1947,379 @@ def _checked_ric_part(
     return ""
 
 
+@_profiled
+def _edit_resource(
+        backend_url: URL,
+        resource: Resource,
+        minify: bool = False) -> tuple[HTML, ResourceId]:
+    # The values are those of the form fields, which must be kept verbatim
+    page = _edit_page(backend_url)
+    if minify:
+        page = page.minified()
+    return page.render(**_edit_form_values(resource)), resource.id
+
+
+@_profiled
+def _edit_form_values(resource: Resource) -> dict[str, HTML]:
+    """
+    The values with which the form for editing a resource is pre-filled
+    """
+    ric_parts = list(_ric_parts_to_check(resource))
+    return {
+        "title_value": resource.title,
+        "checked_application": _checked_type(resource, "web application"),
+        "checked_article": _checked_type(resource, "article"),
+        "checked_dataset": _checked_type(resource, "dataset"),
+        "checked_event": _checked_type(resource, "event"),
+        "checked_thesis": _checked_type(resource, "thesis"),
+        "checked_tool": _checked_type(resource, "tool"),
+        "responsible_value": resource.responsible,
+        "publication_date_value": resource.publication_date,
+        "description_value": resource.description,
+        "links_value": resource.links,
+        "languages_value": resource.languages,
+        "checked_ric_cm_1_0": _checked_ric_part(ric_parts, "RiC-CM 1.0"),
+        "checked_ric_cm_0_2": _checked_ric_part(ric_parts, "RiC-CM 0.2"),
+        "checked_ric_o_1_0": _checked_ric_part(ric_parts, "RiC-O 1.0"),
+        "checked_ric_o_0_2": _checked_ric_part(ric_parts, "RiC-O 0.2"),
+        "checked_ric_other": _checked_ric_part(ric_parts, "Other"),
+        "prospects_value": resource.prospects,
+        "contact_value": resource.contact,
+        "related_to_value": resource.related_to,
+        "id_field": f"<input type=\"hidden\" name=\"id\" value=\"{
+            resource.id}\">"
+    }
+
+
+@cache
+def _edit_page(backend_url: URL) -> _PrebuiltHTML:
+    return _PrebuiltHTML(_site_template.substitute(
+        css_path=f"../{CSS_FILE_NAME}",
+        logo_path=f"../{LOGO_FILE_NAME}",
+        resource_list_path="../index.html",
+        javascript="",
+        introduction=_EDIT_RESOURCE_INTRODUCTION_HTML,
+        add_or_edit_menu="",
+        filter_menu="",
+        content=_add_resource_html_template.substitute(
+            backend_url=backend_url,
+            submit_value="Edit",
+            **_placeholders(
+                "title_value", "checked_application", "checked_article",
+                "checked_dataset", "checked_event", "checked_thesis",
+                "checked_tool", "responsible_value", "publication_date_value",
+                "description_value", "links_value", "languages_value",
+                "checked_ric_cm_1_0", "checked_ric_cm_0_2",
+                "checked_ric_o_1_0", "checked_ric_o_0_2", "checked_ric_other",
+                "prospects_value", "contact_value", "related_to_value",
+                "id_field"))))
+
+
 def edits(
         backend_url: URL,
         path_to_edits: Path,
-        path_to_csv: Path) -> None:
+        path_to_csv: Path,
+        jobs: int = 1,
+        minify: bool = False) -> None:
     """
     Generates HTML files for editing resource details, one for each
     resource, saving them into a directory specified in an environment
     variable. Requires an environment variable specifying the URL of the
-    backend.
+    backend. The pages are rendered in the given number of processes.
     """
-    with open(path_to_csv, "r", encoding="utf-8") as csv_file:
-        csv_reader = DictReader(csv_file)
-        for row in csv_reader:
-            resource_id = row["id"]
-            id_field = f"<input type=\"hidden\" name=\"id\" value=\"{
-                resource_id}\">"
-            ric_parts = list(_ric_parts_to_check(row))
-            with open(
-                    path_to_edits / f"{resource_id}.html",
-                    "w",
-                    encoding="utf-8") as edit_file:
-                edit_file.write(_site_template.substitute(
-                    css_path=f"../{CSS_FILE_NAME}",
-                    logo_path=f"../{LOGO_FILE_NAME}",
-                    resource_list_path="../index.html",
-                    javascript="",
-                    introduction=_EDIT_RESOURCE_INTRODUCTION_HTML,
-                    add_or_edit_menu="",
-                    filter_menu="",
-                    content=_add_resource_html_template.substitute(
-                        backend_url=backend_url,
-                        title_value=row["title"],
-                        checked_application=_checked_type(
-                            row, "web application"),
-                        checked_article=_checked_type(row, "article"),
-                        checked_dataset=_checked_type(row, "dataset"),
-                        checked_event=_checked_type(row, "event"),
-                        checked_thesis=_checked_type(row, "thesis"),
-                        checked_tool=_checked_type(row, "tool"),
-                        responsible_value=row["responsible"],
-                        publication_date_value=row["publication_date"],
-                        description_value=row["description"],
-                        links_value=row["links"],
-                        languages_value=row["languages"],
-                        checked_ric_cm_1_0=_checked_ric_part(
-                            ric_parts, "RiC-CM 1.0"),
-                        checked_ric_cm_0_2=_checked_ric_part(
-                            ric_parts, "RiC-CM 0.2"),
-                        checked_ric_o_1_0=_checked_ric_part(
-                            ric_parts, "RiC-O 1.0"),
-                        checked_ric_o_0_2=_checked_ric_part(
-                            ric_parts, "RiC-O 0.2"),
-                        checked_ric_other=_checked_ric_part(
-                            ric_parts, "Other"),
-                        prospects_value=row["prospects"],
-                        contact_value=row["contact"],
-                        related_to_value=row["related_to"],
-                        id_field=id_field,
-                        submit_value="Edit"
-                    )
-                ))
+    _write_edits(
+        backend_url,
+        path_to_edits,
+        _read_master_document(path_to_csv),
+        jobs,
+        minify)
+
+
+def _write_edits(
+        backend_url: URL,
+        path_to_edits: Path,
+        resources: list[Resource],
+        jobs: int = 1,
+        minify: bool = False) -> None:
+    for edit_html, resource_id in _process_all(
+            resources,
+            partial(_edit_resource, backend_url, minify=minify),
+            jobs):
+        _write_if_changed(path_to_edits / f"{resource_id}.html", edit_html)
+
+
+# A shard of the search index holds the tokens starting with the same
+# characters, so that a query only needs the shards of its own tokens. A shard
+# is keyed by the first two characters of its tokens and, whenever it would be
+# larger than the maximum, only lists the shards keyed by one more character
+# which it is split into. A query thus finds its shards from their names
+# alone, and no file of the index grows however long the list grows. The
+# details of the resources are sharded by id. A shard of either kind which is
+# still too large lists the number of parts it is split into.
+_SEARCH_SHARD_PREFIX_LENGTH = 2
+_SEARCH_SHARD_MAX_BYTES = 16384
+_SEARCH_RESOURCES_PER_SHARD = 100
+# Tokens have neither of these characters
+_SEARCH_SHARD_CHILDREN_KEY = "#children"
+_SEARCH_SHARD_PARTS_KEY = "#parts"
+# Ends the prefix of the shard of the token, if any, which is the whole of
+# the prefix of a split shard
+_SEARCH_SHARD_WHOLE_TOKEN = "$"
+
+_search_token_pattern = regex_compile(r"[^\W_]+")
+
+_language_tag_pattern = regex_compile(r"\[[a-z]{2}\]")
+
+
+def _search_text(text: str) -> str:
+    # The text of a markdown link is searchable, but not URLs
+    text = _link_pattern.sub(lambda match: match["text"] or " ", text)
+    return _language_tag_pattern.sub(" ", text)
+
+
+def _search_tokens(text: str) -> list[str]:
+    return [token for token in _search_token_pattern.findall(_folded(text))
+            if len(token) >= _SEARCH_SHARD_PREFIX_LENGTH]
+
+
+def _searchable_text(resource: Resource) -> str:
+    return " ".join([
+        resource.title,
+        resource.description,
+        " ".join(_responsible_without_links(resource)),
+        resource.contact])
+
+
+def _search_shard_name(prefix: str) -> str:
+    if prefix.isascii() and prefix.isalnum():
+        return prefix
+    # Keeps file names to ASCII
+    return "_" + prefix.encode("utf-8").hex()
+
+
+def _compact_json(value: object) -> str:
+    return to_json(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _json_size(value: object) -> int:
+    return len(_compact_json(value).encode("utf-8"))
+
+
+def _token_shards(
+        postings: dict[str, list[int]],
+        prefix_length: int = _SEARCH_SHARD_PREFIX_LENGTH
+) -> dict[str, dict[str, Any]]:
+    """
+    Groups the tokens by their first prefix_length characters. A group which
+    would be larger than _SEARCH_SHARD_MAX_BYTES is split by one more
+    character, as often as needed, its own shard only listing the prefixes of
+    the groups it is split into. A group of a single token is never split.
+    """
+    groups: defaultdict[str, dict[str, list[int]]] = defaultdict(dict)
+    for token in sorted(postings):
+        prefix = token[:prefix_length] if len(token) >= prefix_length \
+            else token + _SEARCH_SHARD_WHOLE_TOKEN
+        groups[prefix][token] = postings[token]
+    shards: dict[str, dict[str, Any]] = {}
+    for prefix, shard in groups.items():
+        if len(shard) > 1 and _json_size(shard) > _SEARCH_SHARD_MAX_BYTES:
+            split = _token_shards(shard, prefix_length + 1)
+            shards[prefix] = {
+                _SEARCH_SHARD_CHILDREN_KEY: [
+                    child for child in split
+                    if len(child) == prefix_length + 1]}
+            shards.update(split)
+        else:
+            shards[prefix] = shard
+    return shards
+
+
+def _token_shard_parts(shard: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    Splits a shard of a single token, which occurs in too many resources for
+    the shard to stay within _SEARCH_SHARD_MAX_BYTES, into parts holding
+    consecutive ranges of the ids of those resources
+    """
+    if len(shard) > 1 or _json_size(shard) <= _SEARCH_SHARD_MAX_BYTES:
+        return [shard]
+    [(token, resource_ids)] = shard.items()
+    parts: list[dict[str, Any]] = []
+    part_ids: list[int] = []
+    # The size of a part without any id, e.g. '{"token":[]}'
+    part_size = _json_size({token: []})
+    for resource_id in resource_ids:
+        id_size = len(str(resource_id)) + 1
+        if part_ids and part_size + id_size > _SEARCH_SHARD_MAX_BYTES:
+            parts.append({token: part_ids})
+            part_ids = []
+            part_size = _json_size({token: []})
+        part_ids.append(resource_id)
+        part_size += id_size
+    return [*parts, {token: part_ids}]
+
+
+def _resource_shard_parts(
+        shard: dict[str, list[str]]) -> list[dict[str, list[str]]]:
+    """
+    Splits a shard of the details of resources, which would be larger than
+    _SEARCH_SHARD_MAX_BYTES, into parts holding consecutive resources
+    """
+    parts: list[dict[str, list[str]]] = [{}]
+    # The braces, less the comma counted for the first resource
+    part_size = 1
+    for resource_id, details in shard.items():
+        # The resource without braces, and a comma
+        size = _json_size({resource_id: details}) - 1
+        if parts[-1] and part_size + size > _SEARCH_SHARD_MAX_BYTES:
+            parts.append({})
+            part_size = 1
+        parts[-1][resource_id] = details
+        part_size += size
+    return parts
+
+
+def _search_shard_files(
+        directory: str, name: str, parts: list[Any]) -> dict[str, str]:
+    """
+    The file of a shard keyed by its path or, for a shard split into parts, a
+    file listing the number of parts and the file of each part
+    """
+    if len(parts) == 1:
+        return {f"{directory}/{name}.json": _compact_json(parts[0])}
+    return {
+        f"{directory}/{name}.json": _compact_json(
+            {_SEARCH_SHARD_PARTS_KEY: len(parts)}),
+        **{f"{directory}/{name}-{number}.json": _compact_json(part)
+           for number, part in enumerate(parts, 1)}}
+
+
+@_profiled
+def _search_index(resources: list[Resource]) -> dict[str, str]:
+    """
+    Builds an inverted index of the titles, descriptions, responsible people
+    and organisations, and contacts of the resources, mapping each case-folded
+    and accent-stripped token to the ids of the resources in which it occurs.
+    The index is split into small JSON files, keyed by their paths relative to
+    the search directory of the website: 'index.json', with the parameters of
+    the sharding; 'tokens/<shard>.json' for the tokens starting with a given
+    prefix, longer for the more common prefixes; and 'resources/<shard>.json'
+    with the title and type of a range of ids.
+    """
+    postings: defaultdict[str, list[int]] = defaultdict(list)
+    resource_shards: defaultdict[int, dict[str, list[str]]] = \
+        defaultdict(dict)
+    for resource in resources:
+        resource_id = int(resource.id)
+        for token in dict.fromkeys(
+                _search_tokens(_search_text(_searchable_text(resource)))):
+            postings[token].append(resource_id)
+        resource_shards[resource_id // _SEARCH_RESOURCES_PER_SHARD][
+            resource.id] = [resource.display_title, resource.type]
+    files = {
+        "index.json": _compact_json({
+            "prefix_length": _SEARCH_SHARD_PREFIX_LENGTH,
+            "resources_per_shard": _SEARCH_RESOURCES_PER_SHARD
+        })
+    }
+    for prefix, shard in _token_shards(postings).items():
+        files.update(_search_shard_files(
+            "tokens", _search_shard_name(prefix), _token_shard_parts(shard)))
+    for number, shard in resource_shards.items():
+        files.update(_search_shard_files(
+            "resources", str(number), _resource_shard_parts(shard)))
+    return files
+
+
+def _write_search_index(
+        search_files: dict[str, str],
+        path_to_search: Path,
+        stale: Callable[[str], bool] = lambda _: True) -> None:
+    """
+    Writes the files of the search index which are stale, and removes those
+    of a previous index which it no longer has, since the shards of a query
+    are found from their names
+    """
+    for directory in ["tokens", "resources"]:
+        (path_to_search / directory).mkdir(parents=True, exist_ok=True)
+    for name, content in search_files.items():
+        if stale(name):
+            _write_if_changed(path_to_search / name, content)
+    for path in path_to_search.glob("*/*.json"):
+        if path.relative_to(path_to_search).as_posix() not in search_files:
+            path.unlink()
+            for compressed_path in _compressed_paths(path):
+                compressed_path.unlink(missing_ok=True)
+
+
+def _search_shard(path: Path) -> list[dict[str, Any]]:
+    """
+    The shard at the given path or, if split, each of its parts, or nothing if
+    there is no such shard
+    """
+    try:
+        shard = from_json(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return []
+    if _SEARCH_SHARD_PARTS_KEY not in shard:
+        return [shard]
+    return [
+        from_json(path.with_name(f"{path.stem}-{number}.json").read_text(
+            encoding="utf-8"))
+        for number in range(1, shard[_SEARCH_SHARD_PARTS_KEY] + 1)]
+
+
+def _matching_resource_ids(
+        path_to_tokens: Path,
+        query_token: str,
+        prefix: str) -> Generator[int, None, None]:
+    """
+    The ids of the resources of the tokens starting with the query token in
+    the shard of the given prefix or, if that shard was split, in the shards
+    it lists whose prefixes the query token starts with or which start with
+    the query token
+    """
+    for shard in _search_shard(
+            path_to_tokens / f"{_search_shard_name(prefix)}.json"):
+        for child in shard.get(_SEARCH_SHARD_CHILDREN_KEY, []):
+            if query_token.startswith(child) or child.startswith(query_token):
+                yield from _matching_resource_ids(
+                    path_to_tokens, query_token, child)
+        for token, resource_ids in shard.items():
+            if token.startswith(query_token):
+                yield from resource_ids
+
+
+def search(path_to_search: Path, query: str) -> list[tuple[ResourceId, str]]:
+    """
+    Finds the resources which match every word of the query, each word being
+    matched as a prefix of the words of the resources, reading only the
+    shards of the search index which the query needs. Returns the id and
+    title of each resource found. Words shorter than the prefixes by which
+    the index is sharded are ignored.
+    """
+    with open(path_to_search / "index.json", "r", encoding="utf-8") \
+            as index_file:
+        index = from_json(index_file.read())
+    found: set[int] | None = None
+    for query_token in dict.fromkeys(_search_tokens(query)):
+        matches = set(_matching_resource_ids(
+            path_to_search / "tokens",
+            query_token,
+            query_token[:index["prefix_length"]]))
+        found = matches if found is None else found & matches
+    results = []
+    resource_shards: dict[int, dict[str, list[str]]] = {}
+    for resource_id in sorted(found or ()):
+        number = resource_id // index["resources_per_shard"]
+        if number not in resource_shards:
+            resource_shards[number] = {
+                key: details
+                for part in _search_shard(
+                    path_to_search / "resources" / f"{number}.json")
+                for key, details in part.items()}
+        title, _ = resource_shards[number][str(resource_id)]
+        results.append((str(resource_id), title))
+    return results
 
 
 def success(action: str) -> HTML:
@@ -931,6 +2356,394 @@ def failure() -> HTML:
     )
 
 
+def _write_page(path: Path, html: HTML, minify: bool = False) -> None:
+    if minify:
+        html = _minified(html)
+    # Matches the output of the single page sub-commands, which print the HTML
+    # to stdout
+    _write_if_changed(path, html + "\n")
+
+
+def _compressed_paths(path: Path) -> list[Path]:
+    paths = [path.with_name(f"{path.name}.gz")]
+    if brotli_compress is not None:
+        paths.append(path.with_name(f"{path.name}.br"))
+    return paths
+
+
+def _is_compression_stale(path: Path) -> bool:
+    modified = path.stat().st_mtime_ns
+    return any(
+        not compressed_path.exists()
+        or compressed_path.stat().st_mtime_ns < modified
+        for compressed_path in _compressed_paths(path))
+
+
+@_profiled
+def _compress(path: Path) -> None:
+    content = path.read_bytes()
+    # Without a timestamp in the header, the same page always compresses to
+    # the same bytes
+    compressed = gzip_compress(content, compresslevel=9, mtime=0)
+    path.with_name(f"{path.name}.gz").write_bytes(compressed)
+    _metrics.record_write(True, len(compressed))
+    if brotli_compress is not None:
+        compressed = brotli_compress(content)
+        path.with_name(f"{path.name}.br").write_bytes(compressed)
+        _metrics.record_write(True, len(compressed))
+
+
+def _precompress(paths: Iterable[Path], jobs: int = 1) -> None:
+    """
+    Writes a gzip compressed copy of each file next to it, with the suffix
+    .gz, and likewise a brotli compressed copy with the suffix .br if the
+    brotli package is installed, so that they can be served as they are. Only
+    files which have been written since they were last compressed are
+    compressed again, in the given number of processes.
+    """
+    for _ in _process_all(
+            [path for path in paths if _is_compression_stale(path)],
+            _compress,
+            jobs):
+        pass
+
+
+@dataclass(frozen=True)
+class BuildOptions:
+    """
+    Options for building the whole website: the number of processes in which
+    to render the pages of the individual resources, the maximum number of
+    resources on a page of the resource list and its filterings (None for no
+    limit), whether to generate an archive page for each year, whether to
+    generate a page for each value of the other facets, whether to generate
+    the search index, whether to write compressed copies of every page, and
+    whether to collapse the whitespace used for layout in the pages
+    """
+    jobs: int = 1
+    page_size: int | None = None
+    year_archives: bool = False
+    facets: bool = False
+    search_index: bool = False
+    precompress: bool = False
+    minify: bool = False
+
+
+def build_all(
+        path_to_csv: Path,
+        path_to_site: Path,
+        add_backend_url: URL,
+        edit_backend_url: URL,
+        options: BuildOptions = BuildOptions()) -> None:
+    """
+    Generates every page of the website, reading the master document only
+    once, and saving the pages into the directory specified in an environment
+    variable. Requires environment variables specifying the URLs of the
+    backend endpoints for adding and editing a resource.
+    """
+    _build(
+        path_to_csv,
+        path_to_site,
+        add_backend_url,
+        edit_backend_url,
+        options,
+        incremental=False)
+
+
+def build_incrementally(
+        path_to_csv: Path,
+        path_to_site: Path,
+        add_backend_url: URL,
+        edit_backend_url: URL,
+        options: BuildOptions = BuildOptions()) -> None:
+    """
+    As build_all, but only re-generates those pages whose inputs have changed
+    since the last build, as recorded in a manifest of hashes kept in the root
+    directory of the website. Pages of resources which no longer exist in the
+    master document are removed. Does nothing if no relevant change has been
+    made.
+    """
+    _build(
+        path_to_csv,
+        path_to_site,
+        add_backend_url,
+        edit_backend_url,
+        options,
+        incremental=True)
+
+
+# pylint: disable=too-many-arguments,too-many-locals,too-many-statements
+def _build(
+        path_to_csv: Path,
+        path_to_site: Path,
+        add_backend_url: URL,
+        edit_backend_url: URL,
+        options: BuildOptions,
+        incremental: bool) -> None:
+    with _metrics.stage("read master document"):
+        resources = _read_master_document(path_to_csv)
+        previous_manifest = _read_manifest(path_to_site)
+        previous_page_hashes = previous_manifest.page_hashes
+        master_document_hash, last_updated = _last_updated(
+            path_to_csv, previous_manifest)
+    with _metrics.stage("index listings"):
+        listings = _listings(
+            resources, options.year_archives, options.facets)
+        years = [
+            listing.value for listing in listings if listing.facet == "year"]
+    with _metrics.stage("index search"):
+        search_files = _search_index(resources) if options.search_index \
+            else {}
+    with _metrics.stage("hash pages"):
+        page_hashes = _page_hashes(
+            resources,
+            listings,
+            search_files,
+            last_updated,
+            add_backend_url,
+            edit_backend_url,
+            options)
+
+    def is_stale(page: str) -> bool:
+        return not incremental or \
+            previous_page_hashes.get(page) != page_hashes[page] or \
+            not (path_to_site / page).exists()
+
+    # The site may be generated into a directory which does not exist yet
+    for directory in {
+            *(listing.directory for listing in listings),
+            *([FACETS_DIRECTORY_NAME] if options.facets else []),
+            RESOURCE_DETAILS_DIRECTORY_NAME,
+            EDITS_DIRECTORY_NAME}:
+        (path_to_site / directory).mkdir(parents=True, exist_ok=True)
+    with _metrics.stage("write listings"):
+        for listing in listings:
+            # The pages of a listing link to one another, so are all
+            # re-generated together
+            if any(is_stale(_site_path(listing.directory, file_name))
+                   for file_name in _listing_file_names(
+                       listing, options.page_size)):
+                _write_listing(
+                    listing,
+                    path_to_site / listing.directory,
+                    last_updated,
+                    options.page_size,
+                    years,
+                    options.facets,
+                    options.minify)
+        if options.facets and \
+                is_stale(f"{FACETS_DIRECTORY_NAME}/index.html"):
+            _write_page(
+                path_to_site / FACETS_DIRECTORY_NAME / "index.html",
+                _facets_overview(listings),
+                options.minify)
+    with _metrics.stage("write resource details"):
+        _write_resource_details(
+            [resource for resource in resources if is_stale(
+                f"{RESOURCE_DETAILS_DIRECTORY_NAME}/{resource.id}.html")],
+            path_to_site / RESOURCE_DETAILS_DIRECTORY_NAME,
+            options.jobs,
+            options.minify)
+    with _metrics.stage("write edits"):
+        _write_edits(
+            edit_backend_url,
+            path_to_site / EDITS_DIRECTORY_NAME,
+            [resource for resource in resources if is_stale(
+                f"{EDITS_DIRECTORY_NAME}/{resource.id}.html")],
+            options.jobs,
+            options.minify)
+    with _metrics.stage("write other pages"):
+        if is_stale("add_resource.html"):
+            _write_page(
+                path_to_site / "add_resource.html",
+                add_resource(add_backend_url),
+                options.minify)
+        if is_stale("add_success.html"):
+            _write_page(
+                path_to_site / "add_success.html",
+                success("addition"),
+                options.minify)
+        if is_stale("edit_success.html"):
+            _write_page(
+                path_to_site / "edit_success.html",
+                success("edit"),
+                options.minify)
+        if is_stale("failure.html"):
+            _write_page(
+                path_to_site / "failure.html", failure(), options.minify)
+    with _metrics.stage("write search index"):
+        if search_files:
+            _write_search_index(
+                search_files,
+                path_to_site / SEARCH_DIRECTORY_NAME,
+                lambda name: is_stale(f"{SEARCH_DIRECTORY_NAME}/{name}"))
+    with _metrics.stage("precompress"):
+        if options.precompress:
+            _precompress(
+                (path_to_site / page for page in page_hashes), options.jobs)
+    with _metrics.stage("write manifest"):
+        if incremental:
+            for page in previous_page_hashes.keys() - page_hashes.keys():
+                (path_to_site / page).unlink(missing_ok=True)
+                for compressed_path in _compressed_paths(path_to_site / page):
+                    compressed_path.unlink(missing_ok=True)
+        _write_manifest(
+            path_to_site,
+            Manifest(master_document_hash, last_updated, page_hashes))
+
+
+@dataclass
+class Manifest:
+    """
+    Record of the previous build of the website, kept in its root directory:
+    a hash of the master document, the 'last updated' timestamp shown on the
+    resource list, and hashes of the inputs of every page
+    """
+    master_document_hash: str = ""
+    last_updated: str = ""
+    page_hashes: dict[str, str] = field(default_factory=dict)
+
+
+def _last_updated(path_to_csv: Path, previous: Manifest) -> tuple[str, str]:
+    """
+    The 'last updated' timestamp only moves when the content of the master
+    document or of its journal changes, so that re-generating the site does
+    not by itself change any page
+    """
+    digest = sha256(path_to_csv.read_bytes())
+    for entry in journal_entries(path_to_csv):
+        digest.update(entry.name.encode("utf-8"))
+        digest.update(entry.read_bytes())
+    master_document_hash = digest.hexdigest()
+    if master_document_hash == previous.master_document_hash:
+        return master_document_hash, previous.last_updated
+    return master_document_hash, _last_modified(path_to_csv)
+
+
+def _hash(*parts: str) -> str:
+    digest = sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _generator_hash() -> str:
+    # The templates live in this file, so any change to a template or to the
+    # rendering code changes the hash, and forces every page to be rebuilt
+    return sha256(Path(__file__).read_bytes()).hexdigest()
+
+
+_COLUMNS = [
+    "id", "title", "responsible", "description", "publication_date", "type",
+    "links", "languages", "relevant_parts_of_ric", "prospects", "contact",
+    "related_to"
+]
+
+_LISTING_COLUMNS = ["id", "title", "responsible", "publication_date", "type"]
+
+
+def _resource_hash(resource: Resource) -> str:
+    return _hash(to_json(
+        [getattr(resource, column) for column in _COLUMNS],
+        ensure_ascii=False))
+
+
+def _listing_hash(
+        generator_hash: str,
+        last_updated: str,
+        resources: Iterable[Resource]) -> str:
+    """
+    Hash of the columns of the given resources which appear on the resource
+    list and its filterings. Edits to any other column do not affect these
+    pages, except through the 'last updated' timestamp.
+    """
+    return _hash(generator_hash, last_updated, *(
+        to_json(
+            [getattr(resource, column) for column in _LISTING_COLUMNS],
+            ensure_ascii=False)
+        for resource in resources))
+
+
+def _site_path(directory: str, file_name: str) -> str:
+    return f"{directory}/{file_name}" if directory else file_name
+
+
+def _page_hashes(
+        resources: list[Resource],
+        listings: list[_Listing],
+        search_files: dict[str, str],
+        last_updated: str,
+        add_backend_url: URL,
+        edit_backend_url: URL,
+        options: BuildOptions) -> dict[str, str]:
+    """
+    Maps the path of each generated page, relative to the root of the website,
+    to a hash of everything that the page is generated from
+    """
+    generator_hash = _hash(_generator_hash(), to_json(options.minify))
+    page_hashes = {
+        "add_resource.html": _hash(generator_hash, add_backend_url),
+        "add_success.html": generator_hash,
+        "edit_success.html": generator_hash,
+        "failure.html": generator_hash
+    }
+    # Every page of a listing links to the other pages, to the year archives,
+    # and to the overview of the facets
+    navigation = to_json([
+        options.page_size,
+        [listing.name for listing in listings
+         if listing.directory == YEARS_DIRECTORY_NAME],
+        options.facets])
+    if options.facets:
+        page_hashes[f"{FACETS_DIRECTORY_NAME}/index.html"] = _hash(
+            generator_hash,
+            to_json(
+                [[listing.facet, listing.name, listing.value,
+                  len(listing.resources)] for listing in listings],
+                ensure_ascii=False))
+    for listing in listings:
+        listing_hash = _hash(
+            _listing_hash(generator_hash, last_updated, listing.resources),
+            navigation)
+        for file_name in _listing_file_names(listing, options.page_size):
+            page_hashes[_site_path(listing.directory, file_name)] = \
+                listing_hash
+    for name, content in search_files.items():
+        page_hashes[f"{SEARCH_DIRECTORY_NAME}/{name}"] = _hash(content)
+    for resource in resources:
+        resource_hash = _resource_hash(resource)
+        page_hashes[
+            f"{RESOURCE_DETAILS_DIRECTORY_NAME}/{resource.id}.html"] = _hash(
+                generator_hash, resource_hash, *resource.referenced_by)
+        page_hashes[f"{EDITS_DIRECTORY_NAME}/{resource.id}.html"] = _hash(
+            generator_hash, resource_hash, edit_backend_url)
+    return page_hashes
+
+
+def _read_manifest(path_to_site: Path) -> Manifest:
+    try:
+        with open(
+                path_to_site / MANIFEST_FILE_NAME,
+                "r",
+                encoding="utf-8") as manifest_file:
+            return Manifest(**from_json(manifest_file.read()))
+    except FileNotFoundError:
+        return Manifest()
+
+
+def _write_manifest(path_to_site: Path, manifest: Manifest) -> None:
+    _write_if_changed(
+        path_to_site / MANIFEST_FILE_NAME,
+        to_json(asdict(manifest), indent=2, sort_keys=True) + "\n")
+
+
+def _positive_integer(argument: str) -> int:
+    number = int(argument)
+    if number < 1:
+        raise ArgumentTypeError(f"Expecting a positive integer: {argument}")
+    return number
+
+
 def _arguments_parser() -> ArgumentParser:
     argument_parser = ArgumentParser(
         description=(
@@ -938,6 +2751,20 @@ def _arguments_parser() -> ArgumentParser:
             "the master spreadsheet"
         )
     )
+    argument_parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print to stderr the wall time and number of calls of each "
+             "stage of the sub-command and of the functions doing the work "
+             "(parsing, rendering, writing), the slowest rows to render, the "
+             "number of bytes written, and the peak memory allocated by "
+             "Python in the main process. Slows the sub-command down")
+    argument_parser.add_argument(
+        "--metrics-json",
+        type=Path,
+        metavar="PATH",
+        help="Save the measurements described for --profile to the given "
+             "path as JSON")
     subparsers = argument_parser.add_subparsers(
         dest="subcommand")
     resource_list_subparser = subparsers.add_parser(
@@ -982,6 +2809,103 @@ def _arguments_parser() -> ArgumentParser:
         help="For generating the page redirected to upon failure of the "
              "submission of an addition or edit. Outputs the HTML of the "
              "page to stdout")
+    build_all_subparser = subparsers.add_parser(
+        "build-all",
+        help="For generating every page of the website in one go, reading "
+             "the master document only once. The environment variable "
+             "SITE_PATH must be provided, which should be a path to the root "
+             "directory of the website in which to write the generated pages "
+             "to. The environment variables ADD_BACKEND_URL and "
+             "EDIT_BACKEND_URL must also be provided, which should be the "
+             "URLs of the backend endpoints to which the POSTs made when "
+             "submitting the forms to add or edit a resource respectively "
+             "are to be sent")
+    search_subparser = subparsers.add_parser(
+        "search",
+        help="For searching the resources using the search index generated "
+             "by build-all with --search-index. The environment variable "
+             "SEARCH_PATH must be provided, which should be a path to the "
+             "directory of the search index. Outputs the id and title of "
+             "each resource found, one per line")
+    search_subparser.add_argument(
+        "query",
+        type=str,
+        help="Words which must all occur in a resource, each possibly as "
+             "the start of a longer word")
+    validate_subparser = subparsers.add_parser(
+        "validate",
+        help="For checking every row of the master document, without "
+             "generating any pages. Outputs each error found, with the line, "
+             "id, and column of the row in which it occurs, and exits with a "
+             "non-zero status if there are any")
+    validate_subparser.add_argument(
+        "--jobs",
+        type=_positive_integer,
+        default=1,
+        help="Number of processes in which to check the rows. Defaults to 1")
+    for subparser in [
+            resource_details_subparser,
+            edit_resource_subparser,
+            build_all_subparser]:
+        subparser.add_argument(
+            "--jobs",
+            type=_positive_integer,
+            default=1,
+            help="Number of processes in which to render the pages of the "
+                 "individual resources. Defaults to 1")
+    for subparser in [filter_subparser, build_all_subparser]:
+        subparser.add_argument(
+            "--page-size",
+            type=_positive_integer,
+            default=None,
+            help="Maximum number of resources on each page of the resource "
+                 "list and its filterings, which are split into pages linked "
+                 "to one another if longer. Defaults to no limit")
+    build_all_subparser.add_argument(
+        "--year-archives",
+        action="store_true",
+        help="Also generate a page for each year, listing the resources "
+             "whose earliest date is in that year, in the directory 'years' "
+             "of the website")
+    build_all_subparser.add_argument(
+        "--facets",
+        action="store_true",
+        help="Also generate a page for each language, part of RiC, and "
+             "responsible person or organisation, listing the resources "
+             "which have it, together with an overview of these pages, in "
+             "the directory 'facets' of the website")
+    build_all_subparser.add_argument(
+        "--search-index",
+        action="store_true",
+        help="Also generate a search index of the titles, descriptions, "
+             "responsible people and organisations, and contacts of the "
+             "resources, as JSON files sharded by the first characters of "
+             "each word, in the directory 'search' of the website")
+    build_all_subparser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="Also write a gzip compressed copy of every generated file next "
+             "to it, with the suffix .gz, and a brotli compressed copy with "
+             "the suffix .br if the brotli package is installed, in the "
+             "number of processes given by --jobs. Only files written since "
+             "they were last compressed are compressed again")
+    for subparser in [
+            resource_list_subparser,
+            resource_details_subparser,
+            filter_subparser,
+            edit_resource_subparser,
+            build_all_subparser]:
+        subparser.add_argument(
+            "--minify",
+            action="store_true",
+            help="Collapse the whitespace used to lay out the HTML, rather "
+                 "than indenting it for readability")
+    build_all_subparser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-generate the pages whose inputs have changed since the "
+             "last build, according to the manifest of hashes in the root "
+             "directory of the website")
     resource_list_subparser.add_argument(
         "path_to_master_document",
         type=Path,
@@ -998,6 +2922,14 @@ def _arguments_parser() -> ArgumentParser:
         "path_to_master_document",
         type=Path,
         help="Path to the CSV master document for the resource list")
+    build_all_subparser.add_argument(
+        "path_to_master_document",
+        type=Path,
+        help="Path to the CSV master document for the resource list")
+    validate_subparser.add_argument(
+        "path_to_master_document",
+        type=Path,
+        help="Path to the CSV master document for the resource list")
     success_subparser.add_argument(
         "action",
         type=str,
@@ -1006,11 +2938,64 @@ def _arguments_parser() -> ArgumentParser:
     return argument_parser
 
 
-# pylint: disable=too-many-branches
+def _metrics_report(subcommand: str, wall_seconds: float) -> dict[str, Any]:
+    _, peak_traced_memory = get_traced_memory()
+    return {
+        "subcommand": subcommand,
+        "wall_seconds": round(wall_seconds, 6),
+        "peak_traced_memory_bytes": peak_traced_memory,
+        **_metrics.snapshot()
+    }
+
+
+def _print_profile(report: dict[str, Any]) -> None:
+    print(f"{report["subcommand"]}: {report["wall_seconds"]:.3f} s, peak "
+          "memory allocated by Python "
+          f"{report["peak_traced_memory_bytes"] / 2**20:.1f} MiB", file=stderr)
+    for heading in ["stages", "functions"]:
+        print(f"\n{heading.capitalize():<40} {"seconds":>10} {"calls":>9}",
+              file=stderr)
+        for name, timing in report[heading].items():
+            print(f"{name:<40} {timing["seconds"]:>10.3f} "
+                  f"{timing["calls"]:>9}", file=stderr)
+    print("\nSlowest rows", file=stderr)
+    for row in report["slowest_rows"]:
+        print(f"{row["function"]:<30} id {row["id"]:<8} "
+              f"{row["seconds"] * 1000:>8.2f} ms", file=stderr)
+    print(f"\n{report["files_written"]} files written "
+          f"({report["bytes_written"]} bytes), "
+          f"{report["files_unchanged"]} unchanged", file=stderr)
+
+
 def _main() -> None:
     arguments = _arguments_parser().parse_args()
+    profiling = arguments.profile or arguments.metrics_json is not None
+    if profiling:
+        _metrics.reset(enabled=True)
+        start_tracing()
+    start = perf_counter()
+    with _metrics.stage(arguments.subcommand):
+        _run_subcommand(arguments)
+    if not profiling:
+        return
+    report = _metrics_report(arguments.subcommand, perf_counter() - start)
+    stop_tracing()
+    if arguments.profile:
+        _print_profile(report)
+    if arguments.metrics_json is not None:
+        arguments.metrics_json.write_text(
+            to_json(report, indent=2) + "\n", encoding="utf-8")
+
+
+# pylint: disable=too-many-branches
+def _run_subcommand(arguments: Namespace) -> None:
     if arguments.subcommand == "resource-list":
-        print(resource_list(arguments.path_to_master_document))
+        path_to_csv = arguments.path_to_master_document
+        stdout.writelines(_resource_list(
+            _read_master_document(path_to_csv),
+            _last_modified(path_to_csv),
+            arguments.minify))
+        print()
     elif arguments.subcommand == "resource-details":
         try:
             path_to_resource_details = Path(environ["RESOURCE_DETAILS_PATH"])
@@ -1019,7 +3004,9 @@ def _main() -> None:
                      "be set")
         resource_details(
             arguments.path_to_master_document,
-            path_to_resource_details)
+            path_to_resource_details,
+            arguments.jobs,
+            arguments.minify)
     elif arguments.subcommand == "add-resource":
         try:
             backend_url = environ["BACKEND_URL"]
@@ -1033,7 +3020,9 @@ def _main() -> None:
             sys_exit("The environment variable FILTERINGS_PATH must be set")
         filterings(
             arguments.path_to_master_document,
-            path_to_filterings)
+            path_to_filterings,
+            arguments.page_size,
+            arguments.minify)
     elif arguments.subcommand == "edit-resource":
         try:
             backend_url = environ["BACKEND_URL"]
@@ -1043,11 +3032,64 @@ def _main() -> None:
             path_to_edits = Path(environ["EDITS_PATH"])
         except KeyError:
             sys_exit("The environment variable EDITS_PATH must be set")
-        edits(backend_url, path_to_edits, arguments.path_to_master_document)
+        edits(
+            backend_url,
+            path_to_edits,
+            arguments.path_to_master_document,
+            arguments.jobs,
+            arguments.minify)
     elif arguments.subcommand == "success":
         print(success(arguments.action))
     elif arguments.subcommand == "failure":
         print(failure())
+    elif arguments.subcommand == "search":
+        try:
+            path_to_search = Path(environ["SEARCH_PATH"])
+        except KeyError:
+            sys_exit("The environment variable SEARCH_PATH must be set")
+        for resource_id, title in search(path_to_search, arguments.query):
+            print(f"{resource_id}\t{title}")
+    elif arguments.subcommand == "validate":
+        path_to_csv = arguments.path_to_master_document
+        errors = validate(path_to_csv, arguments.jobs)
+        for error in errors:
+            if error.journal_entry is None:
+                print(f"{path_to_csv}:{error.line}: id {error.resource_id}, "
+                      f"column {error.column}: {error.message}")
+            elif not error.resource_id:
+                print(f"{error.journal_entry}: {error.message}")
+            else:
+                print(f"{error.journal_entry}: id {error.resource_id}, "
+                      f"column {error.column}: {error.message}")
+        if errors:
+            sys_exit(f"{len(errors)} errors found in {path_to_csv}")
+    elif arguments.subcommand == "build-all":
+        try:
+            path_to_site = Path(environ["SITE_PATH"])
+        except KeyError:
+            sys_exit("The environment variable SITE_PATH must be set")
+        try:
+            add_backend_url = environ["ADD_BACKEND_URL"]
+        except KeyError:
+            sys_exit("The environment variable ADD_BACKEND_URL must be set")
+        try:
+            edit_backend_url = environ["EDIT_BACKEND_URL"]
+        except KeyError:
+            sys_exit("The environment variable EDIT_BACKEND_URL must be set")
+        build = build_incrementally if arguments.incremental else build_all
+        build(
+            arguments.path_to_master_document,
+            path_to_site,
+            add_backend_url,
+            edit_backend_url,
+            BuildOptions(
+                arguments.jobs,
+                arguments.page_size,
+                arguments.year_archives,
+                arguments.facets,
+                arguments.search_index,
+                arguments.precompress,
+                arguments.minify))
     else:
         raise ValueError
 
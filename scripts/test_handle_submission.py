@@ -0,0 +1,263 @@
+"""
+Tests of the passing on of submissions by handle_submission.py, with GitHub
+replaced by stand-ins which fail as told.
+
+Run from the root of the repository, e.g.
+
+```
+python -m unittest discover -s scripts
+```
+
+Requires requests to be installed.
+"""
+
+# pylint: disable=protected-access
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os import environ
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Thread
+from unittest import TestCase, main
+from unittest.mock import patch
+
+from requests import ConnectionError as RequestsConnectionError, HTTPError, \
+    Response
+
+import handle_submission
+from handle_submission import (
+    CLAIM_TIMEOUT, DISPATCH_ATTEMPTS, FileQueue, InMemoryQueue,
+    MissingSubmissionQueueException, drain)
+
+
+def _http_error(
+        status_code: int, headers: dict[str, str] | None = None) -> HTTPError:
+    response = Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    return HTTPError(f"{status_code} error", response=response)
+
+
+class _GitHubStandIn:
+    """
+    Records the submissions passed on to it, raising in turn the given
+    exceptions, if any, before each succeeds
+    """
+
+    def __init__(self, *failures: Exception) -> None:
+        self.failures = list(failures)
+        self.dispatched: list[tuple[str, str]] = []
+
+    def __call__(self, submission: str, action: str) -> None:
+        if self.failures:
+            raise self.failures.pop(0)
+        self.dispatched.append((submission, action))
+
+
+class DrainTest(TestCase):
+    """
+    Tests of drain with an InMemoryQueue
+    """
+
+    def setUp(self) -> None:
+        self.queue = InMemoryQueue()
+        self.queue.put("title=First", "add")
+        self.queue.put("id=1&title=Second", "edit")
+        self.waits: list[float] = []
+
+    def _drain(self, github: _GitHubStandIn) -> int:
+        return drain(self.queue, github, self.waits.append)
+
+    def test_success(self) -> None:
+        github = _GitHubStandIn()
+        self.assertEqual(self._drain(github), 0)
+        self.assertEqual(
+            github.dispatched,
+            [("title=First", "add"), ("id=1&title=Second", "edit")])
+        self.assertEqual(self.queue.keys(), [])
+        self.assertEqual(self.queue.claimed, {})
+        self.assertEqual(self.waits, [])
+
+    def test_retry(self) -> None:
+        github = _GitHubStandIn(
+            RequestsConnectionError("Connection refused"), _http_error(502))
+        self.assertEqual(self._drain(github), 0)
+        self.assertEqual(len(github.dispatched), 2)
+        self.assertEqual(self.waits, [2, 4])
+
+    def test_retries_exhausted(self) -> None:
+        github = _GitHubStandIn(
+            *(_http_error(500) for _ in range(DISPATCH_ATTEMPTS)))
+        self.assertEqual(self._drain(github), 2)
+        self.assertEqual(github.dispatched, [])
+        self.assertEqual(len(self.queue.keys()), 2)
+        self.assertEqual(self.queue.claimed, {})
+        self.assertEqual(len(self.waits), DISPATCH_ATTEMPTS - 1)
+
+    def test_drop(self) -> None:
+        github = _GitHubStandIn(_http_error(422))
+        self.assertEqual(self._drain(github), 0)
+        self.assertEqual(github.dispatched, [("id=1&title=Second", "edit")])
+        self.assertEqual(self.queue.keys(), [])
+        self.assertEqual(self.queue.claimed, {})
+
+    def test_rate_limited(self) -> None:
+        for headers in [
+                {"x-ratelimit-remaining": "0"}, {"retry-after": "60"}]:
+            with self.subTest(headers=headers):
+                github = _GitHubStandIn(_http_error(403, headers))
+                self.assertEqual(self._drain(github), 2)
+                self.assertEqual(github.dispatched, [])
+                self.assertEqual(len(self.queue.keys()), 2)
+                self.assertEqual(self.waits, [])
+
+    def test_forbidden_is_retried(self) -> None:
+        github = _GitHubStandIn(_http_error(403), _http_error(404))
+        self.assertEqual(self._drain(github), 0)
+        self.assertEqual(len(github.dispatched), 2)
+        self.assertEqual(self.waits, [2, 4])
+
+    def test_claimed_by_another_drain(self) -> None:
+        first_key = self.queue.keys()[0]
+        self.queue.claim(first_key)
+        keys = self.queue.keys()
+        github = _GitHubStandIn()
+        with patch.object(self.queue, "keys", return_value=[first_key, *keys]):
+            self.assertEqual(self._drain(github), 2)
+        self.assertEqual(github.dispatched, [])
+
+
+class FileQueueTest(TestCase):
+    """
+    Tests of the claiming of the submissions of a FileQueue
+    """
+
+    def setUp(self) -> None:
+        # pylint: disable-next=consider-using-with
+        self.directory = TemporaryDirectory()
+        self.now = 0.0
+        self.queue = FileQueue(Path(self.directory.name), lambda: self.now)
+        self.queue.put("title=First", "add")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_claimed_once(self) -> None:
+        [key] = self.queue.keys()
+        other_queue = FileQueue(Path(self.directory.name), lambda: self.now)
+        self.assertEqual(
+            self.queue.claim(key),
+            {"action": "add", "form_submission": "title=First"})
+        self.assertIsNone(other_queue.claim(key))
+        self.assertEqual(other_queue.keys(), [])
+        self.queue.release(key)
+        self.assertEqual(other_queue.keys(), [key])
+
+    def test_abandoned_claim_is_released(self) -> None:
+        [key] = self.queue.keys()
+        self.queue.claim(key)
+        self.now += CLAIM_TIMEOUT
+        self.assertEqual(self.queue.keys(), [])
+        self.now += 1
+        self.assertEqual(self.queue.keys(), [key])
+
+
+class _GitHubAPIStandIn(BaseHTTPRequestHandler):
+    """
+    Answers every request with 204 on a connection kept alive, except that it
+    closes the connection without any response for as many requests as told
+    """
+    protocol_version = "HTTP/1.1"
+    requests_received = 0
+    requests_to_drop = 0
+
+    # pylint: disable-next=invalid-name
+    def do_POST(self) -> None:
+        """
+        Reads the request, and answers it or closes the connection
+        """
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        cls = type(self)
+        cls.requests_received += 1
+        if cls.requests_to_drop:
+            cls.requests_to_drop -= 1
+            self.close_connection = True
+            return
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *_: object) -> None:
+        pass
+
+
+class PostToGitHubTest(TestCase):
+    """
+    Tests that a request is only sent again if a connection kept alive turns
+    out to have been closed, against a local stand-in for the GitHub API
+    """
+
+    def setUp(self) -> None:
+        _GitHubAPIStandIn.requests_received = 0
+        _GitHubAPIStandIn.requests_to_drop = 0
+        self.server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), _GitHubAPIStandIn)
+        Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        handle_submission._github_session.cache_clear()
+        api_url = patch.object(handle_submission, "GITHUB_API_URL", self.url)
+        api_url.start()
+        self.addCleanup(api_url.stop)
+
+    def tearDown(self) -> None:
+        handle_submission._github_session.cache_clear()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _post(self) -> int:
+        return handle_submission._post_to_github(
+            f"{self.url}/dispatches", headers={}).status_code
+
+    def test_closed_connection_kept_alive_is_sent_again(self) -> None:
+        self.assertEqual(self._post(), 204)
+        _GitHubAPIStandIn.requests_to_drop = 1
+        self.assertEqual(self._post(), 204)
+        self.assertEqual(_GitHubAPIStandIn.requests_received, 3)
+
+    def test_sent_again_once(self) -> None:
+        self.assertEqual(self._post(), 204)
+        _GitHubAPIStandIn.requests_to_drop = 2
+        with self.assertRaises(RequestsConnectionError):
+            self._post()
+        self.assertEqual(_GitHubAPIStandIn.requests_received, 3)
+
+    def test_new_connection_is_not_sent_again(self) -> None:
+        _GitHubAPIStandIn.requests_to_drop = 1
+        with self.assertRaises(RequestsConnectionError):
+            self._post()
+        self.assertEqual(_GitHubAPIStandIn.requests_received, 1)
+
+
+class SubmissionQueueTest(TestCase):
+    """
+    Tests of the configuration of the queue
+    """
+
+    def test_deferred_dispatch_requires_a_lasting_queue(self) -> None:
+        with patch.object(handle_submission, "DEFERRED_DISPATCH", True):
+            for queue_path in [None, "/tmp/submission-queue"]:
+                with self.subTest(queue_path=queue_path), \
+                        patch.dict(environ, clear=True), \
+                        self.assertRaises(MissingSubmissionQueueException):
+                    if queue_path is not None:
+                        environ["SUBMISSION_QUEUE_PATH"] = queue_path
+                    handle_submission._submission_queue()
+            with patch.dict(
+                    environ, {"SUBMISSION_QUEUE_PATH": "/mnt/efs/queue"}):
+                self.assertEqual(
+                    handle_submission._submission_queue(),
+                    FileQueue(Path("/mnt/efs/queue")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Tests of the generation of the website by resource_list.py from the master
+document of the repository.
+
+Run from the root of the repository, e.g.
+
+```
+python -m unittest discover -s scripts
+```
+"""
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+
+from resource_list import (
+    EDITS_DIRECTORY_NAME, FACETS_DIRECTORY_NAME, FILTERINGS_DIRECTORY_NAME,
+    MANIFEST_FILE_NAME, RESOURCE_DETAILS_DIRECTORY_NAME,
+    SEARCH_DIRECTORY_NAME, YEARS_DIRECTORY_NAME, BuildOptions, build_all,
+    build_incrementally)
+
+_MASTER_DOCUMENT_PATH = \
+    Path(__file__).parent.parent / "master-document" / "resource_list.csv"
+
+
+class BuildAllTest(TestCase):
+    """
+    Tests of build_all
+    """
+
+    def setUp(self) -> None:
+        # pylint: disable-next=consider-using-with
+        self.directory = TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_build_into_empty_directory(self) -> None:
+        for number, options in enumerate([
+                BuildOptions(),
+                BuildOptions(
+                    page_size=10,
+                    year_archives=True,
+                    facets=True,
+                    search_index=True)]):
+            with self.subTest(options=options):
+                path_to_site = Path(self.directory.name) / f"site-{number}"
+                build_all(
+                    _MASTER_DOCUMENT_PATH,
+                    path_to_site,
+                    "https://example.org/add",
+                    "https://example.org/edit",
+                    options)
+                for path in [
+                        "index.html",
+                        "add_resource.html",
+                        MANIFEST_FILE_NAME,
+                        f"{RESOURCE_DETAILS_DIRECTORY_NAME}/1.html",
+                        f"{EDITS_DIRECTORY_NAME}/1.html"]:
+                    self.assertTrue((path_to_site / path).is_file())
+                self.assertTrue(any(
+                    (path_to_site / FILTERINGS_DIRECTORY_NAME).iterdir()))
+                if options.facets:
+                    for directory in [
+                            YEARS_DIRECTORY_NAME, FACETS_DIRECTORY_NAME]:
+                        self.assertTrue(any(
+                            (path_to_site / directory).iterdir()))
+                    self.assertTrue(
+                        (path_to_site / SEARCH_DIRECTORY_NAME /
+                         "index.json").is_file())
+
+    def test_pages_beyond_the_last_are_removed(self) -> None:
+        path_to_site = Path(self.directory.name) / "site"
+        for build, page_size, pages in [
+                (build_all, 10, 5),
+                (build_all, 20, 3),
+                (build_all, 10, 5),
+                (build_incrementally, None, 1)]:
+            with self.subTest(build=build.__name__, page_size=page_size):
+                build(
+                    _MASTER_DOCUMENT_PATH,
+                    path_to_site,
+                    "https://example.org/add",
+                    "https://example.org/edit",
+                    BuildOptions(page_size=page_size))
+                self.assertEqual(
+                    sorted(path.name for path in path_to_site.glob("*.html")
+                           if path.name.startswith("index")),
+                    sorted(["index.html", *(
+                        f"index_{page_number}.html"
+                        for page_number in range(2, pages + 1))]))
+
+
+if __name__ == "__main__":
+    main()
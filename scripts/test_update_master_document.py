@@ -0,0 +1,198 @@
+"""
+Tests of the changes made to the master document by update_master_document.py,
+directly or through its journal, on a master document in a temporary
+directory.
+
+Run from the root of the repository, e.g.
+
+```
+python -m unittest discover -s scripts
+```
+"""
+
+# pylint: disable=protected-access
+
+from csv import DictReader as csv_reader
+from io import BytesIO, StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase, main
+from unittest.mock import patch
+
+import update_master_document
+from update_master_document import (
+    FIELDNAMES, journal_entries, rejected_journal_path, with_journal)
+
+_HEADER = ",".join(FIELDNAMES) + "\n"
+
+# Values with commas, doubled quotes, and line breaks, as a spreadsheet
+# writes them
+_ROWS = [
+    "1,First,\"Doe, Jane\",\"A \"\"quoted\"\" word\",2020,Article,,,,,,,\n",
+    "2,Second,Doe,\"Over\nseveral\r\nlines, \"\"5\"\"\",2021,Article,,,,,,,"
+    "\r\n",
+    "3,Third,Doe,\"Ends with a quote \"\"\",2022,Tool,,,,,,,1\n"
+]
+
+
+class _MasterDocumentTest(TestCase):
+    """
+    Base of the tests, writing the master document into a temporary directory
+    which stands in for the repository
+    """
+
+    def setUp(self) -> None:
+        # pylint: disable-next=consider-using-with
+        self.directory = TemporaryDirectory()
+        self.path_to_csv = Path(self.directory.name) / "resource_list.csv"
+        self.path_to_csv.write_bytes(
+            (_HEADER + "".join(_ROWS)).encode("utf-8"))
+        for target, value in [
+                ("MASTER_DOCUMENT_PATH", self.path_to_csv),
+                ("stderr", StringIO())]:
+            patcher = patch.object(update_master_document, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def _rows(self) -> list[dict[str, str]]:
+        with open(self.path_to_csv, "r", encoding="utf-8", newline="") \
+                as csv_file:
+            return list(csv_reader(csv_file))
+
+
+class RecordsTest(_MasterDocumentTest):
+    """
+    Tests of the splitting of the master document into its rows as they are
+    """
+
+    def test_records(self) -> None:
+        with open(self.path_to_csv, "rb") as csv_file:
+            csv_file.readline()
+            self.assertEqual(
+                list(update_master_document._records(csv_file)),
+                [row.encode("utf-8") for row in _ROWS])
+
+    def test_unterminated_last_row(self) -> None:
+        self.assertEqual(
+            list(update_master_document._records(
+                BytesIO(b"1,\"a\nb\"\n2,\"c"))),
+            [b"1,\"a\nb\"\n", b"2,\"c"])
+
+
+class LastIdTest(_MasterDocumentTest):
+    """
+    Tests of the finding of the id of the last row from the end of the master
+    document
+    """
+
+    def test_last_id(self) -> None:
+        self.assertEqual(
+            update_master_document._largest_id_of_master_document(), 3)
+
+    def test_line_of_last_value_looking_like_a_row(self) -> None:
+        with open(self.path_to_csv, "a", encoding="utf-8", newline="") \
+                as csv_file:
+            csv_file.write(
+                "4,Fourth,Doe,\"Two\n5,lines\",2023,Tool,,,,,,,\n")
+        self.assertEqual(
+            update_master_document._largest_id_of_master_document(), 4)
+
+
+class ApplyTest(_MasterDocumentTest):
+    """
+    Tests of the application of additions and edits to the master document
+    """
+
+    def test_edit_leaves_other_rows_as_they_were(self) -> None:
+        update_master_document._apply(
+            [{"title": "Fourth"}],
+            {"2": [{"id": "2", "title": "Second, \"edited\""},
+                   {"id": "2", "type": "Tool"}]})
+        content = self.path_to_csv.read_bytes().decode("utf-8")
+        # The edited row keeps its line break
+        added_row = "4,Fourth" + "," * (len(FIELDNAMES) - 2) + "\n"
+        self.assertTrue(content.startswith(_HEADER + _ROWS[0]))
+        self.assertTrue(content.endswith("\r\n" + _ROWS[2] + added_row))
+        rows = self._rows()
+        self.assertEqual(
+            [row["id"] for row in rows], ["1", "2", "3", "4"])
+        self.assertEqual(rows[1]["title"], "Second, \"edited\"")
+        self.assertEqual(rows[1]["type"], "Tool")
+        self.assertEqual(
+            rows[1]["description"], "Over\nseveral\r\nlines, \"5\"")
+
+    def test_edit_of_missing_id(self) -> None:
+        content = self.path_to_csv.read_bytes()
+        with self.assertRaises(ValueError):
+            update_master_document._apply(
+                [], {"9": [{"id": "9", "title": "Ninth"}]})
+        self.assertEqual(self.path_to_csv.read_bytes(), content)
+        self.assertFalse(self.path_to_csv.with_name(
+            f"{self.path_to_csv.name}.tmp").exists())
+
+
+class JournalTest(_MasterDocumentTest):
+    """
+    Tests that the master document read with its journal is as it is once the
+    journal is compacted into it
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        for action, form_submission in [
+                ("add", "title=Fourth&description=Two%0Alines"),
+                ("edit", "id=3&title=Third%2C+%22edited%22"),
+                ("edit", "id=9&title=Ninth"),
+                ("edit", "id=4&type=Tool"),
+                ("edit", "id=3&type=Article")]:
+            update_master_document._record_in_journal(action, form_submission)
+        self.entries = journal_entries(self.path_to_csv)
+        journal = update_master_document.journal_path(self.path_to_csv)
+        (journal / "0-not-json.json").write_text("{", encoding="utf-8")
+        (journal / "1-no-id.json").write_text(
+            "{\"action\": \"edit\", \"form_submission\": \"title=x\"}",
+            encoding="utf-8")
+
+    def test_compacted_as_read(self) -> None:
+        rejected: list[str] = []
+        read_with_journal = list(with_journal(
+            self._rows(),
+            self.path_to_csv,
+            lambda entry, _: rejected.append(entry.name)))
+        update_master_document._compact()
+        self.assertEqual(self._rows(), read_with_journal)
+        self.assertEqual(
+            [row["id"] for row in read_with_journal], ["1", "2", "3", "4"])
+        self.assertEqual(read_with_journal[2]["title"], "Third, \"edited\"")
+        self.assertEqual(read_with_journal[2]["type"], "Article")
+        self.assertEqual(read_with_journal[3]["type"], "Tool")
+        self.assertEqual(
+            read_with_journal[3]["description"], "Two\nlines")
+        self.assertEqual(journal_entries(self.path_to_csv), [])
+        self.assertEqual(
+            sorted(path.name for path in
+                   rejected_journal_path(self.path_to_csv).iterdir()),
+            sorted(rejected))
+        self.assertEqual(len(rejected), 3)
+
+    def test_column_sources(self) -> None:
+        column_sources: dict[str, dict[str, Path]] = {}
+        for _ in with_journal(
+                self._rows(),
+                self.path_to_csv,
+                lambda *_: None,
+                column_sources):
+            pass
+        [add, edit_3, _, edit_4, edit_3_again] = self.entries
+        self.assertEqual(column_sources["3"]["title"], edit_3)
+        self.assertEqual(column_sources["3"]["type"], edit_3_again)
+        self.assertEqual(column_sources["4"]["title"], add)
+        self.assertEqual(column_sources["4"]["type"], edit_4)
+        self.assertNotIn("1", column_sources)
+
+
+if __name__ == "__main__":
+    main()
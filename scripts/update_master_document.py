@@ -2,12 +2,24 @@
 Given a form submission for adding a resource, appends a new row to the
 master document CSV file with the submitted data. Given a form submission for
 editing a resource, replaces the affected row in the master document CSV file
-with the submitted data.
+with the submitted data. Given many submissions of either kind as JSON Lines,
+applies them all in a single pass over the master document. Submissions can
+also be recorded in a journal, a file for each, rather than changing the
+master document, and the journal later compacted into it.
 """
 
 from argparse import ArgumentParser
-from csv import DictReader as csv_reader, DictWriter as csv_writer
+from csv import (
+    DictReader as csv_reader, DictWriter as csv_writer, Error as CSVError,
+    reader as csv_row_reader)
+from io import SEEK_END, StringIO
+from json import dumps as to_json, loads as from_json
 from pathlib import Path
+from secrets import token_hex
+from shutil import copyfileobj
+from sys import stderr, stdin
+from time import time_ns
+from typing import BinaryIO, Callable, Generator, Iterable
 from urllib.parse import parse_qs as parse_form_data
 
 Row = dict[str, str]
@@ -20,14 +32,22 @@ FIELDNAMES = [
 
 MASTER_DOCUMENT_PATH = Path("master-document") / "resource_list.csv"
 
-
-def _add_missing_fields(edited: Row, current: Row) -> None:
-    for field in FIELDNAMES:
-        if field not in edited:
-            edited[field] = current[field]
+# Number of bytes read at a time when reading the master document backwards
+_TAIL_BLOCK_SIZE = 4096
 
 
 def _largest_id_of_master_document() -> int:
+    """
+    The rows of the master document are in increasing order of id, as rows are
+    only ever appended by _add (resource_list.py validate reports any row
+    breaking this order after a hand edit), so the largest id is that of the
+    last row, which is found by reading the document from its end. Falls back
+    to reading every row if the last row cannot be made out, e.g. if the
+    document has no rows
+    """
+    last_id = _id_of_last_row(MASTER_DOCUMENT_PATH)
+    if last_id is not None:
+        return last_id
     largest_id = -1
     with open(MASTER_DOCUMENT_PATH, "r", encoding="utf-8") as master_document:
         for row in csv_reader(master_document):
@@ -35,44 +55,390 @@ def _largest_id_of_master_document() -> int:
     return largest_id
 
 
-def _add(form_submission: str) -> None:
-    details = {
+def _id_of_last_row(path_to_csv: Path) -> int | None:
+    """
+    Reads the CSV file backwards from its end, a block at a time, until it
+    reaches the line break which ends the second to last row, and parses the
+    text after it as one complete row, so in time independent of the size of
+    the file. As values may span several lines, a line break only ends a row
+    if it is outside double quotes. The file ends outside double quotes, and
+    each double quote opens or closes a quoted value, or is one of the two by
+    which a double quote within a value is written, so a line break is outside
+    double quotes if and only if an even number of them comes after it. None
+    if the last row cannot be made out, e.g. if its id is not a whole number
+    """
+    with open(path_to_csv, "rb") as csv_file:
+        header = next(csv_row_reader([csv_file.readline().decode("utf-8")]))
+        header_end = csv_file.tell()
+        position = csv_file.seek(0, SEEK_END)
+        tail = b""
+        while position > header_end:
+            block_start = max(header_end, position - _TAIL_BLOCK_SIZE)
+            csv_file.seek(block_start)
+            block = csv_file.read(position - block_start)
+            tail = block + tail
+            position = block_start
+            rows_text = tail.rstrip(b"\r\n")
+            # Only the line breaks in the block just read are new candidates,
+            # besides the start of the first row once the header is reached
+            starts = []
+            line_break = min(len(block), len(rows_text))
+            while (line_break := rows_text.rfind(
+                    b"\n", 0, line_break)) != -1:
+                starts.append(line_break + 1)
+            if position == header_end:
+                starts.append(0)
+            for start in starts:
+                if rows_text.count(b"\"", start) % 2 != 0:
+                    # The line break is within a value
+                    continue
+                rows = _complete_rows(rows_text[start:], len(header))
+                if len(rows) == 1 and rows[0][header.index("id")].isdigit():
+                    return int(rows[0][header.index("id")])
+                return None
+    return None
+
+
+def _complete_rows(text: bytes, number_of_columns: int) -> list[list[str]]:
+    """
+    The rows of the text if it parses as CSV with the given number of columns,
+    or no rows if not
+    """
+    try:
+        rows = list(
+            csv_row_reader(StringIO(text.decode("utf-8")), strict=True))
+    except (CSVError, UnicodeDecodeError):
+        return []
+    if any(len(row) != number_of_columns for row in rows):
+        return []
+    return rows
+
+
+def _details(form_submission: str) -> Row:
+    return {
         field: " | ".join(values)
         for field, values in parse_form_data(form_submission).items()
     }
-    details["id"] = str(_largest_id_of_master_document() + 1)
-    with open(MASTER_DOCUMENT_PATH, "a", encoding="utf-8") as master_document:
-        csv_writer(
-            master_document,
-            FIELDNAMES,
-            delimiter=",",
-            quotechar="\"",
-            lineterminator="\n").writerow(details)
+
+
+def _csv_row(row: Row, fieldnames: list[str], line_terminator: str) -> bytes:
+    csv_row = StringIO()
+    csv_writer(
+        csv_row,
+        fieldnames,
+        delimiter=",",
+        quotechar="\"",
+        lineterminator=line_terminator).writerow(row)
+    return csv_row.getvalue().encode("utf-8")
+
+
+def journal_path(path_to_csv: Path) -> Path:
+    """
+    The directory of the journal of the master document at the given path.
+    Each submission recorded in the journal is a file of its own, so that
+    submissions recorded concurrently (e.g. on different branches) never
+    conflict
+    """
+    return path_to_csv.with_suffix(".journal")
+
+
+def journal_entries(path_to_csv: Path) -> list[Path]:
+    """
+    The files of the journal of the master document at the given path, in the
+    order in which the submissions were recorded
+    """
+    journal = journal_path(path_to_csv)
+    if not journal.is_dir():
+        return []
+    return sorted(journal.glob("*.json"))
+
+
+def _record_in_journal(action: str, form_submission: str) -> None:
+    journal = journal_path(MASTER_DOCUMENT_PATH)
+    journal.mkdir(exist_ok=True)
+    # The names sort in the order of recording, the random part keeping
+    # apart submissions recorded at the same time
+    name = f"{time_ns()}-{token_hex(4)}"
+    temporary_path = journal / f"{name}.tmp"
+    temporary_path.write_text(
+        to_json({"action": action, "form_submission": form_submission}) +
+        "\n",
+        encoding="utf-8")
+    temporary_path.replace(journal / f"{name}.json")
+
+
+def rejected_journal_path(path_to_csv: Path) -> Path:
+    """
+    The directory into which compacting moves the entries of the journal of
+    the master document at the given path which cannot be applied, e.g. an
+    edit of an id which no resource has, so that they can be looked into
+    without stopping the rest of the journal from being applied
+    """
+    return journal_path(path_to_csv) / "rejected"
+
+
+def _report_rejected(entry: Path, reason: str) -> None:
+    print(f"Skipping journal entry {entry.name}: {reason}", file=stderr)
+
+
+def _journal(
+        path_to_csv: Path,
+        rejected: Callable[[Path, str], None]
+) -> list[tuple[Path, str, Row]]:
+    """
+    The submissions recorded in the journal of the master document at the
+    given path, each with its entry and action. An entry which cannot be read
+    is passed to rejected, with the reason, and left out
+    """
+    submissions = []
+    for entry in journal_entries(path_to_csv):
+        try:
+            action, details = _submission(entry.read_text(encoding="utf-8"))
+        except (UnicodeDecodeError, ValueError) as error:
+            rejected(entry, str(error))
+            continue
+        submissions.append((entry, action, details))
+    return submissions
+
+
+def with_journal(
+        rows: Iterable[Row],
+        path_to_csv: Path,
+        rejected: Callable[[Path, str], None] = _report_rejected,
+        column_sources: dict[str, dict[str, Path]] | None = None
+) -> Generator[Row, None, None]:
+    """
+    Given the rows of the master document at the given path, yields them as
+    they will be once its journal is compacted into it, i.e. with the edits
+    applied and followed by the additions. An entry which cannot be applied,
+    i.e. which cannot be read or is an edit of an id which no resource has,
+    is passed to rejected, with the reason, and left out, as compacting
+    leaves it out. If column_sources is given, the entry which last set each
+    column of each added or edited resource is recorded in it, by id
+    """
+    submissions = _journal(path_to_csv, rejected)
+    if not submissions:
+        yield from rows
+        return
+    edits: dict[str, list[tuple[Path, Row]]] = {}
+    for entry, action, details in submissions:
+        if action == "edit":
+            edits.setdefault(details["id"], []).append((entry, details))
+
+    def edited(row: Row) -> Row:
+        for entry, details in edits.pop(row["id"], []):
+            row.update(details)
+            if column_sources is not None:
+                column_sources.setdefault(row["id"], {}).update(
+                    dict.fromkeys(details, entry))
+        return row
+
+    largest_id = -1
+    for row in rows:
+        if (row["id"] or "").isdigit():
+            largest_id = max(largest_id, int(row["id"]))
+        yield edited(row)
+    additions = [
+        (entry, details)
+        for entry, action, details in submissions if action == "add"]
+    for number, (entry, details) in enumerate(additions):
+        row = dict.fromkeys(FIELDNAMES, "") | details
+        row["id"] = str(largest_id + 1 + number)
+        if column_sources is not None:
+            column_sources[row["id"]] = dict.fromkeys(row, entry)
+        yield edited(row)
+    for resource_id, unapplied_edits in sorted(edits.items()):
+        for entry, _ in unapplied_edits:
+            rejected(entry, f"No resource has the id: {resource_id}")
+
+
+def _compact() -> None:
+    """
+    Applies the submissions recorded in the journal to the master document in
+    a single pass, in the order in which they were recorded, and then removes
+    them from the journal. An entry which cannot be applied is moved to the
+    rejected directory of the journal instead, with the reason printed to
+    stderr
+    """
+    rejected_entries: list[tuple[Path, str]] = []
+    submissions = _journal(
+        MASTER_DOCUMENT_PATH,
+        lambda entry, reason: rejected_entries.append((entry, reason)))
+    additions = [
+        details for _, action, details in submissions if action == "add"]
+    edits: dict[str, list[Row]] = {}
+    for _, action, details in submissions:
+        if action == "edit":
+            edits.setdefault(details["id"], []).append(details)
+    if submissions:
+        missing_ids = _apply(additions, edits, missing_ids_are_errors=False)
+        rejected_entries.extend(
+            (entry, f"No resource has the id: {details["id"]}")
+            for entry, action, details in submissions
+            if action == "edit" and details["id"] in missing_ids)
+    rejected_entries.sort()
+    for entry, reason in rejected_entries:
+        rejected_directory = rejected_journal_path(MASTER_DOCUMENT_PATH)
+        rejected_directory.mkdir(exist_ok=True)
+        entry.replace(rejected_directory / entry.name)
+        print(f"Moved journal entry {entry.name} to {rejected_directory}: "
+              f"{reason}", file=stderr)
+    for entry, _, _ in submissions:
+        entry.unlink(missing_ok=True)
+
+
+def _add(form_submission: str) -> None:
+    _apply([_details(form_submission)], {})
+
+
+def _records(csv_file: BinaryIO) -> Generator[bytes, None, None]:
+    """
+    The rows of the CSV file from its current position, each exactly as it is
+    in the file, including the line break which ends it. A row ends at the
+    first line break after an even number of quotes, as the quotes within a
+    value are doubled
+    """
+    record = b""
+    for line in csv_file:
+        record += line
+        if record.count(b"\"") % 2 == 0:
+            yield record
+            record = b""
+    if record:
+        yield record
+
+
+def _row_with_id_in(
+        record: bytes,
+        header: list[str],
+        resource_ids: set[str]) -> Row | None:
+    if not any(resource_id.encode("utf-8") in record
+               for resource_id in resource_ids):
+        return None
+    row = dict(zip(
+        header, next(csv_row_reader(StringIO(record.decode("utf-8"))))))
+    return row if row["id"] in resource_ids else None
 
 
 def _edit(form_submission: str) -> None:
-    details = {
-        field: " | ".join(values)
-        for field, values in parse_form_data(form_submission).items()
-    }
-    resource_id = details["id"]
-    rows: list[dict[str, str]]
-    with open(MASTER_DOCUMENT_PATH, "r", encoding="utf-8") as master_document:
-        rows = list(csv_reader(master_document))
-    with open(MASTER_DOCUMENT_PATH, "w", encoding="utf-8") as master_document:
-        writer = csv_writer(
-            master_document,
-            FIELDNAMES,
-            delimiter=",",
-            quotechar="\"",
-            lineterminator="\n")
-        writer.writeheader()
-        for row in rows:
-            if row["id"] == resource_id:
-                _add_missing_fields(details, row)
-                writer.writerow(details)
-            else:
-                writer.writerow(row)
+    details = _details(form_submission)
+    _apply([], {details["id"]: [details]})
+
+
+def _batch(lines: Iterable[str]) -> None:
+    _apply(*_submissions(lines))
+
+
+def _submission(line: str) -> tuple[str, Row]:
+    """
+    The action, "add" or "edit", and the details of a submission given as a
+    JSON object with the action and the form submission, e.g.
+    {"action": "add", "form_submission": "title=..."}. Raises a ValueError if
+    the line is not such an object, or if an edit lacks the id of the resource
+    """
+    submission = from_json(line)
+    if not isinstance(submission, dict) or \
+            not isinstance(submission.get("form_submission"), str):
+        raise ValueError(
+            f"Expecting an object with an action and a form submission: "
+            f"{line.strip()}")
+    details = _details(submission["form_submission"])
+    if submission.get("action") not in ["add", "edit"]:
+        raise ValueError(f"Unknown action: {submission.get("action")}")
+    if submission["action"] == "edit" and "id" not in details:
+        raise ValueError(
+            f"Expecting an edit to give the id of the resource: "
+            f"{submission["form_submission"]}")
+    return submission["action"], details
+
+
+def _submissions(
+        lines: Iterable[str]) -> tuple[list[Row], dict[str, list[Row]]]:
+    """
+    Each line is a JSON object with the action, "add" or "edit", and the
+    form submission, e.g. {"action": "add", "form_submission": "title=..."}.
+    Resources are added in the order of the lines, and several edits of the
+    same resource are applied in the order of the lines, each on top of the
+    previous ones
+    """
+    additions = []
+    edits: dict[str, list[Row]] = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        action, details = _submission(line)
+        if action == "add":
+            additions.append(details)
+        else:
+            edits.setdefault(details["id"], []).append(details)
+    return additions, edits
+
+
+def _allocate_ids(
+        additions: list[Row],
+        next_id: int,
+        edits: dict[str, list[Row]]) -> None:
+    """
+    Gives the additions consecutive ids from the given one, applying to them
+    the edits of these ids, which are removed from the edits
+    """
+    for number, details in enumerate(additions):
+        details["id"] = str(next_id + number)
+        for edit in edits.pop(details["id"], []):
+            details.update(edit)
+
+
+def _apply(
+        additions: list[Row],
+        edits: dict[str, list[Row]],
+        missing_ids_are_errors: bool = True) -> set[str]:
+    """
+    Gives the additions the ids following the largest id of the master
+    document, applying to them any edits of these ids, and appends them to
+    it. If there are edits, the master document
+    is copied to a temporary file row by row, as it is, except for the edited
+    rows and with the additions at the end, and is then replaced by the
+    temporary file, so that the other rows are left exactly as they were.
+    Nothing is changed if an edited id does not exist, unless
+    missing_ids_are_errors is False, in which case the edits of the ids which
+    do not exist are left out. Returns the ids which do not exist
+    """
+    _allocate_ids(additions, _largest_id_of_master_document() + 1, edits)
+    added_rows = b"".join(
+        _csv_row(details, FIELDNAMES, "\n") for details in additions)
+    if not edits:
+        with open(MASTER_DOCUMENT_PATH, "ab") as master_document:
+            master_document.write(added_rows)
+        return set()
+    temporary_path = MASTER_DOCUMENT_PATH.with_name(
+        f"{MASTER_DOCUMENT_PATH.name}.tmp")
+    with open(MASTER_DOCUMENT_PATH, "rb") as master_document, \
+            open(temporary_path, "wb") as temporary_file:
+        header_line = master_document.readline()
+        temporary_file.write(header_line)
+        header = next(csv_row_reader([header_line.decode("utf-8")]))
+        unedited_ids = set(edits)
+        for record in _records(master_document):
+            row = _row_with_id_in(record, header, unedited_ids)
+            if row is None:
+                temporary_file.write(record)
+                continue
+            for details in edits[row["id"]]:
+                row.update(details)
+            temporary_file.write(_csv_row(
+                row, header, record[len(record.rstrip(b"\r\n")):].decode(
+                    "utf-8")))
+            unedited_ids.remove(row["id"])
+            if not unedited_ids:
+                copyfileobj(master_document, temporary_file)
+                break
+        temporary_file.write(added_rows)
+    if unedited_ids and missing_ids_are_errors:
+        temporary_path.unlink()
+        raise ValueError(
+            f"No resource has the id: {", ".join(sorted(unedited_ids))}")
+    temporary_path.replace(MASTER_DOCUMENT_PATH)
+    return unedited_ids
 
 
 def _arguments_parser() -> ArgumentParser:
@@ -84,22 +450,64 @@ def _arguments_parser() -> ArgumentParser:
     subparsers = argument_parser.add_subparsers(dest="subcommand")
     add_parser = subparsers.add_parser("add", help="Add a resource")
     edit_parser = subparsers.add_parser("edit", help="Edit a resource")
+    subparsers.add_parser(
+        "batch",
+        help="Add and edit resources according to many form submissions, "
+             "read from stdin as JSON Lines, each an object with the action "
+             "(\"add\" or \"edit\") and the form submission, e.g. "
+             "{\"action\": \"add\", \"form_submission\": \"title=...\"}")
+    subparsers.add_parser(
+        "compact",
+        help="Apply the submissions recorded in the journal to the master "
+             "document, in the order in which they were recorded, and remove "
+             "them from the journal")
     for parser in [add_parser, edit_parser]:
         parser.add_argument(
             "form_submission",
             type=str,
             help="The string sent in the body of a form submission POST from "
                  "the Resource List")
+        parser.add_argument(
+            "--journal",
+            action="store_true",
+            help="Record the submission in the journal, in a file of its own, "
+                 "rather than changing the master document")
     return argument_parser
 
 
+def _check_edited_id_exists(form_submission: str) -> None:
+    """
+    Raises a ValueError unless the edited resource is in the master document
+    with its journal applied, so that an edit of an id which no resource has
+    is refused when it is recorded, rather than when the journal is applied
+    """
+    details = _details(form_submission)
+    if "id" not in details:
+        raise ValueError(
+            f"Expecting an edit to give the id of the resource: "
+            f"{form_submission}")
+    with open(MASTER_DOCUMENT_PATH, "r", encoding="utf-8") as master_document:
+        if not any(
+                row["id"] == details["id"]
+                for row in with_journal(
+                    csv_reader(master_document), MASTER_DOCUMENT_PATH)):
+            raise ValueError(f"No resource has the id: {details["id"]}")
+
+
 def _main() -> None:
     arguments = _arguments_parser().parse_args()
-    form_submission = arguments.form_submission
-    if arguments.subcommand == "add":
-        _add(form_submission)
+    if arguments.subcommand in ["add", "edit"] and arguments.journal:
+        if arguments.subcommand == "edit":
+            _check_edited_id_exists(arguments.form_submission)
+        _record_in_journal(arguments.subcommand, arguments.form_submission)
+    elif arguments.subcommand == "add":
+        _add(arguments.form_submission)
     elif arguments.subcommand == "edit":
-        _edit(form_submission)
+        _edit(arguments.form_submission)
+    elif arguments.subcommand == "compact":
+        _compact()
+    elif arguments.subcommand == "batch":
+        _batch(stdin)
     else:
         raise ValueError
 